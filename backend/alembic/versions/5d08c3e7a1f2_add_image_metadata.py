@@ -0,0 +1,32 @@
+"""Add image metadata and placeholder
+
+Revision ID: 5d08c3e7a1f2
+Revises: e91b3f6a4c27
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d08c3e7a1f2'
+down_revision = 'e91b3f6a4c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('images', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('images', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('images', sa.Column('file_size', sa.Integer(), nullable=True))
+    op.add_column('images', sa.Column('mime_type', sa.String(length=50), nullable=True))
+    op.add_column('images', sa.Column('placeholder', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('images', 'placeholder')
+    op.drop_column('images', 'mime_type')
+    op.drop_column('images', 'file_size')
+    op.drop_column('images', 'height')
+    op.drop_column('images', 'width')
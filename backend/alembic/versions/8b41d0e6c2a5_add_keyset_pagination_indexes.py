@@ -0,0 +1,30 @@
+"""Add keyset pagination indexes
+
+Revision ID: 8b41d0e6c2a5
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41d0e6c2a5'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_albums_created_at_id', 'albums', ['created_at', 'id'])
+    op.create_index('ix_images_created_at_id', 'images', ['created_at', 'id'])
+    op.create_index('ix_images_album_id_created_at_id', 'images', ['album_id', 'created_at', 'id'])
+    op.create_index('ix_contacts_created_at_id', 'contacts', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_created_at_id', table_name='contacts')
+    op.drop_index('ix_images_album_id_created_at_id', table_name='images')
+    op.drop_index('ix_images_created_at_id', table_name='images')
+    op.drop_index('ix_albums_created_at_id', table_name='albums')
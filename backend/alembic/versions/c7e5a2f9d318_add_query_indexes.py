@@ -0,0 +1,35 @@
+"""Add indexes for crud query shapes
+
+Revision ID: c7e5a2f9d318
+Revises: 8b41d0e6c2a5
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e5a2f9d318'
+down_revision = '8b41d0e6c2a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # get_albums(label=...)
+    op.create_index('ix_albums_label_created_at_id', 'albums', ['label', 'created_at', 'id'])
+    # get_services 按 order 排序
+    op.create_index('ix_services_order', 'services', ['order'])
+    # get_statistics 的未读消息计数，只索引未读行
+    op.create_index(
+        'ix_contacts_unread', 'contacts', ['id'],
+        postgresql_where=sa.text('is_read = 0'),
+        sqlite_where=sa.text('is_read = 0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_unread', table_name='contacts')
+    op.drop_index('ix_services_order', table_name='services')
+    op.drop_index('ix_albums_label_created_at_id', table_name='albums')
@@ -0,0 +1,62 @@
+"""Add full-text search indexes
+
+Revision ID: e91b3f6a4c27
+Revises: c7e5a2f9d318
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91b3f6a4c27'
+down_revision = 'c7e5a2f9d318'
+branch_labels = None
+depends_on = None
+
+# 参与搜索的列，与 app/models.py 的 SEARCH_COLUMNS 一致
+SEARCH_COLUMNS = {
+    'albums': ('album_name', 'description'),
+    'images': ('image_name', 'description'),
+    'contacts': ('name', 'phone', 'email', 'message'),
+}
+
+
+def document(columns) -> str:
+    return " || ' ' || ".join(f"coalesce({name}, '')" for name in columns)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # tsvector 匹配整词，三元组匹配中文等没有空格分词的子串
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table, columns in SEARCH_COLUMNS.items():
+            op.execute(f"CREATE INDEX ix_{table}_search_tsv ON {table} USING gin (to_tsvector('simple', {document(columns)}))")
+            op.execute(f"CREATE INDEX ix_{table}_search_trgm ON {table} USING gin (({document(columns)}) gin_trgm_ops)")
+    elif dialect == 'sqlite':
+        # FTS5 外部内容表，触发器保持与原表同步
+        for table, columns in SEARCH_COLUMNS.items():
+            names = ", ".join(columns)
+            new_values = ", ".join(f"new.{name}" for name in columns)
+            old_values = ", ".join(f"old.{name}" for name in columns)
+            delete_old = f"INSERT INTO {table}_fts({table}_fts, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+            insert_new = f"INSERT INTO {table}_fts(rowid, {names}) VALUES (new.id, {new_values});"
+            op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5({names}, content='{table}', content_rowid='id', tokenize='trigram')")
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN {insert_new} END")
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN {delete_old} END")
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END")
+            op.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table in SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_trgm")
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_tsv")
+    elif dialect == 'sqlite':
+        for table in SEARCH_COLUMNS:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
@@ -1,4 +1,8 @@
 import os
+import time
+import threading
+import functools
+from collections import OrderedDict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
@@ -19,6 +23,11 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24小时过期
 # 管理员账号
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
+# 可直接配置 bcrypt 哈希（例如 $2b$12$...），此时不再使用 ADMIN_PASSWORD
+ADMIN_PASSWORD_HASH = os.getenv("ADMIN_PASSWORD_HASH", "")
+
+# 已验证 token 的缓存条目数，0 表示不缓存
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "256"))
 
 # 测试模式 - 设置为 True 可以跳过身份验证直接登录
 TEST_MODE = True
@@ -53,12 +62,17 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+@functools.lru_cache(maxsize=None)
+def get_admin_password_hash():
+    """管理员密码哈希只计算一次，bcrypt 每次需要几十毫秒"""
+    return ADMIN_PASSWORD_HASH or get_password_hash(ADMIN_PASSWORD)
+
 # 用户验证
 def get_user(username: str):
     if username == ADMIN_USERNAME:
         return UserInDB(
             username=ADMIN_USERNAME,
-            hashed_password=get_password_hash(ADMIN_PASSWORD),
+            hashed_password=get_admin_password_hash(),
             disabled=False
         )
     return None
@@ -85,6 +99,44 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+class TokenCache:
+    """最近验证过的 token 及其声明，按 LRU 淘汰，过期的条目不再返回"""
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            payload = self._entries.get(token)
+            if payload is None:
+                return None
+            if payload.get("exp", 0) <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return payload
+
+    def set(self, token: str, payload: dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[token] = payload
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+token_cache = TokenCache()
+
+def decode_token(token: str) -> dict:
+    """校验签名和过期时间，结果按 token 缓存；无效时抛出 JWTError"""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.set(token, payload)
+    return payload
+
 # 获取当前用户
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     if TEST_MODE:
@@ -96,7 +148,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -0,0 +1,175 @@
+import os
+import time
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+from pydantic import TypeAdapter
+
+# 读缓存配置
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))  # 秒
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# 管理面板统计数据的缓存时间，0 表示不缓存
+STATISTICS_CACHE_TTL = float(os.getenv("STATISTICS_CACHE_TTL", "10"))
+# 为空时使用进程内缓存；设置为 redis://... 时多个 worker 共享缓存
+CACHE_URL = os.getenv("CACHE_URL", "")
+
+class LocalBackend:
+    """进程内 TTL + LRU 缓存，也作为共享缓存的本地替身"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        # 初始版本取进程启动时间，重启后的版本号（以及依赖它的 ETag）不会与重启前重复
+        self._initial_version = time.time_ns()
+        self._lock = threading.Lock()
+
+    async def get_version(self, namespace: str) -> int:
+        return self._versions.get(namespace, self._initial_version)
+
+    async def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def invalidate(self, namespace: str):
+        self.invalidate_sync(namespace)
+
+    def invalidate_sync(self, namespace: str):
+        # 版本号递增后旧键不再被访问，由 LRU 自然淘汰
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, self._initial_version) + 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+class RedisBackend:
+    """基于 Redis 的共享缓存，值以 JSON 存储"""
+
+    serializes = True
+
+    def __init__(self, url: str):
+        import redis
+        import redis.asyncio
+
+        self._client = redis.asyncio.Redis.from_url(url)
+        # 后台线程中的失效操作使用同步客户端
+        self._sync_client = redis.Redis.from_url(url)
+
+    async def get_version(self, namespace: str) -> int:
+        version = await self._client.get(f"cache-version:{namespace}")
+        return int(version or 0)
+
+    async def get(self, key: str):
+        return await self._client.get(key)
+
+    async def set(self, key: str, value, ttl: float):
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def invalidate(self, namespace: str):
+        await self._client.incr(f"cache-version:{namespace}")
+
+    def invalidate_sync(self, namespace: str):
+        self._sync_client.incr(f"cache-version:{namespace}")
+
+    def size(self):
+        return None
+
+class ReadCache:
+    """crud 读函数的缓存，写函数通过 invalidate 按命名空间失效"""
+
+    def __init__(self, backend, ttl: float = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, namespace: str, field: str):
+        with self._stats_lock:
+            counters = self.stats.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0})
+            counters[field] += 1
+
+    def cached(self, namespace: str, result_type, ttl: float = None):
+        """缓存异步 crud 读函数，结果按 result_type 转为 pydantic 模型后保存"""
+        adapter = TypeAdapter(result_type)
+        ttl = self.ttl if ttl is None else ttl
+
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            async def wrapper(db, *args, **kwargs):
+                if ttl <= 0:
+                    return await func(db, *args, **kwargs)
+                bound = signature.bind(db, *args, **kwargs)
+                bound.apply_defaults()
+                params = ",".join(f"{name}={value!r}" for name, value in bound.arguments.items() if name != "db")
+                version = await self.backend.get_version(namespace)
+                key = f"cache:{namespace}:{version}:{func.__name__}({params})"
+
+                value = await self.backend.get(key)
+                if value is not None:
+                    self._count(namespace, "hits")
+                    return adapter.validate_json(value) if getattr(self.backend, "serializes", False) else value
+
+                self._count(namespace, "misses")
+                result = await func(db, *args, **kwargs)
+                if result is None:
+                    return None
+                value = adapter.validate_python(result, from_attributes=True)
+                stored = adapter.dump_json(value) if getattr(self.backend, "serializes", False) else value
+                await self.backend.set(key, stored, ttl)
+                return value
+
+            return wrapper
+
+        return decorator
+
+    async def invalidate(self, *namespaces: str):
+        """crud 写函数中调用，Redis 使用异步客户端，不阻塞事件循环"""
+        for namespace in namespaces:
+            await self.backend.invalidate(namespace)
+            self._count(namespace, "invalidations")
+
+    async def version(self, namespace: str) -> int:
+        """命名空间的版本号，每次写入后递增；HTTP 缓存用它区分同一秒内的多次修改"""
+        return await self.backend.get_version(namespace)
+
+    def invalidate_sync(self, *namespaces: str):
+        """后台线程和脚本中调用"""
+        for namespace in namespaces:
+            self.backend.invalidate_sync(namespace)
+            self._count(namespace, "invalidations")
+
+    def get_stats(self):
+        with self._stats_lock:
+            namespaces = {name: dict(counters) for name, counters in self.stats.items()}
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "ttl": self.ttl,
+            "namespaces": namespaces,
+        }
+
+def create_backend(url: str = CACHE_URL):
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    return LocalBackend()
+
+# 公开目录数据（服务、相册）的读缓存
+catalog_cache = ReadCache(create_backend())
@@ -0,0 +1,219 @@
+import os
+import uuid
+import zlib
+from typing import Optional
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from .file_response import RangeFileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+# brotli 可选：未安装时只使用 gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 压缩配置
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # 小于该字节数的响应不压缩
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))  # 动态响应使用较低质量，压缩更快
+# 静态文件只压缩一次，使用最高压缩率
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+# 可压缩的类型；图片（SVG 除外）、视频和压缩包本身已压缩
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+# 编码名称和预压缩文件后缀，按优先级排列
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+def available_encodings():
+    return [name for name in ENCODINGS if name != "br" or brotli is not None]
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.split(";")[0].strip().lower().startswith(COMPRESSIBLE_TYPES)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """根据 Accept-Encoding 选择 br 或 gzip，都不接受时返回 None"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for name in available_encodings():
+        if accepted.get(name, accepted.get("*", 0)) > 0:
+            return name
+    return None
+
+def _compressor(encoding: str, static: bool = False):
+    """返回 (compress(chunk), flush()) 的增量压缩器"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=STATIC_BROTLI_QUALITY if static else BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    # wbits 31 为 gzip 格式
+    compressor = zlib.compressobj(STATIC_GZIP_LEVEL if static else GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+class CompressionMiddleware:
+    """按 Accept-Encoding 对可压缩的动态响应进行 br/gzip 压缩。
+
+    跳过已设置 Content-Encoding 的响应（如预压缩的静态文件）、小于 min_size 的响应和 304 等空响应。
+    压缩后的 ETag 改为弱 ETag，与未压缩版本区分，条件请求仍按弱比较命中。
+    """
+
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    def _eligible(self, start_message, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if start_message["status"] in (204, 206, 304) or "content-encoding" in headers or "content-range" in headers:
+            return False
+        if not is_compressible(headers.get("content-type")):
+            return False
+        # 流式响应按 Content-Length 判断，长度未知时压缩
+        size = len(body) if not more_body else int(headers.get("content-length", self.min_size))
+        return size >= self.min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        # HEAD 响应没有响应体，Content-Length 需要与 GET 一致
+        if encoding is None or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # 等第一个响应体消息到达后再决定是否压缩
+                start_message = message
+                return
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] != "http.response.body":
+                # 零拷贝等扩展消息无法压缩，先发送原样的响应头
+                passthrough = True
+                if start_message is not None:
+                    await send(start_message)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(scope=start_message)
+                if not self._eligible(start_message, headers, body, more_body):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    # 流式响应：长度未知，逐块压缩
+                    del headers["Content-Length"]
+                    await send(start_message)
+                else:
+                    # 完整的响应体，一次压缩并设置准确的 Content-Length
+                    compressed = compressor[0](body) + compressor[1]()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+            compress, flush = compressor
+            chunk = compress(body)
+            if not more_body:
+                chunk += flush()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+def precompressed_path(path: str, encoding: str) -> str:
+    return path + ENCODINGS[encoding]
+
+def ensure_precompressed(path: str, encoding: str) -> Optional[str]:
+    """返回预压缩文件路径，不存在或比原文件旧时生成一次；压缩后没有变小时返回 None"""
+    stat = os.stat(path)
+    if stat.st_size < COMPRESSION_MIN_SIZE:
+        return None
+    variant = precompressed_path(path, encoding)
+    try:
+        variant_stat = os.stat(variant)
+    except FileNotFoundError:
+        variant_stat = None
+    if variant_stat is None or variant_stat.st_mtime_ns < stat.st_mtime_ns:
+        compress, flush = _compressor(encoding, static=True)
+        temp_path = f"{variant}.{uuid.uuid4().hex}.tmp"
+        with open(path, "rb") as source, open(temp_path, "wb") as target:
+            for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                target.write(compress(chunk))
+            target.write(flush())
+        # 先写临时文件再替换，并发请求不会读到写了一半的文件
+        os.replace(temp_path, variant)
+        variant_stat = os.stat(variant)
+    return variant if variant_stat.st_size < stat.st_size else None
+
+def remove_precompressed(paths):
+    """删除文件时同时删除本地的预压缩文件"""
+    for path in paths:
+        for encoding in ENCODINGS:
+            variant = precompressed_path(path, encoding)
+            if os.path.exists(variant):
+                os.remove(variant)
+
+class PrecompressedStaticFiles(StaticFiles):
+    """可压缩的静态文件首次请求时生成 .br/.gz 文件，之后直接返回预压缩文件；所有文件支持 Range"""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = RangeFileResponse(full_path, status_code=status_code, stat_result=stat_result, method=scope["method"])
+        if COMPRESSION_ENABLED and is_compressible(response.media_type) and stat_result.st_size >= COMPRESSION_MIN_SIZE:
+            # 可能有预压缩版本的路径，未压缩的响应（包括 304）也要声明 Vary，共享缓存才不会混用两种版本
+            response.headers.add_vary_header("Accept-Encoding")
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if not COMPRESSION_ENABLED or not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+        if not is_compressible(response.media_type):
+            return response
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            return response
+        variant = await run_in_threadpool(ensure_precompressed, response.path, encoding)
+        if variant is None:
+            return response
+        compressed = RangeFileResponse(
+            variant,
+            stat_result=await run_in_threadpool(os.stat, variant),
+            media_type=response.media_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            method=scope["method"],
+        )
+        if self.is_not_modified(compressed.headers, request_headers):
+            return NotModifiedResponse(compressed.headers)
+        return compressed
@@ -1,150 +1,312 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, aliased
+from sqlalchemy import case, func, select, update, or_
 from . import models, schemas
 from typing import List, Optional
 from .models import LabelEnum
+from .cache import catalog_cache, STATISTICS_CACHE_TTL
+from .pagination import Cursor, RankCursor, apply_keyset, restore_order
+from .search import build_search_query
 
 # 相册相关操作
-def get_albums(db: Session, skip: int = 0, limit: int = 100, label: Optional[LabelEnum] = None):
-    query = db.query(models.AlbumModel)
+@catalog_cache.cached("albums", List[schemas.Album])
+async def get_albums(db: AsyncSession, skip: int = 0, limit: int = 100, label: Optional[LabelEnum] = None, cursor: Optional[Cursor] = None):
+    query = select(models.AlbumModel)
     if label:
         query = query.filter(models.AlbumModel.label == label)
-    return query.order_by(models.AlbumModel.created_at.desc()).offset(skip).limit(limit).all()
+    result = await db.scalars(apply_keyset(query, models.AlbumModel, cursor, skip, limit))
+    return restore_order(result, cursor)
 
-def get_album(db: Session, album_id: int):
-    return db.query(models.AlbumModel).filter(models.AlbumModel.id == album_id).first()
+async def get_album(db: AsyncSession, album_id: int):
+    query = select(models.AlbumModel).options(selectinload(models.AlbumModel.images)).filter(models.AlbumModel.id == album_id)
+    return await db.scalar(query)
 
-def create_album(db: Session, album: schemas.AlbumCreate):
+@catalog_cache.cached("albums", schemas.AlbumWithImages)
+async def get_album_with_images(db: AsyncSession, album_id: int):
+    return await get_album(db, album_id)
+
+@catalog_cache.cached("albums", List[schemas.GalleryAlbum])
+async def get_gallery(db: AsyncSession, skip: int = 0, limit: int = 100, label: Optional[LabelEnum] = None, images_per_album: int = 4):
+    """相册列表连同封面、前 N 张图片和图片总数，固定两次查询"""
+    query = select(models.AlbumModel)
+    if label:
+        query = query.filter(models.AlbumModel.label == label)
+    albums = (await db.scalars(query.order_by(models.AlbumModel.created_at.desc()).offset(skip).limit(limit))).all()
+    if not albums:
+        return []
+
+    # 每个相册按时间取前 N 张，同时带上封面图片和图片总数
+    album_ids = [album.id for album in albums]
+    cover_ids = [int(album.cover_image) for album in albums if album.cover_image and album.cover_image.isdigit()]
+    ranked = select(
+        models.ImageModel,
+        func.row_number().over(
+            partition_by=models.ImageModel.album_id,
+            order_by=(models.ImageModel.created_at.desc(), models.ImageModel.id.desc()),
+        ).label("position"),
+        func.count().over(partition_by=models.ImageModel.album_id).label("image_count"),
+    ).filter(models.ImageModel.album_id.in_(album_ids)).subquery()
+    image = aliased(models.ImageModel, ranked)
+    rows = (await db.execute(
+        select(image, ranked.c.position, ranked.c.image_count)
+        .filter(or_(ranked.c.position <= images_per_album, ranked.c.id.in_(cover_ids)))
+        .order_by(ranked.c.album_id, ranked.c.position)
+    )).all()
+
+    images = {album_id: [] for album_id in album_ids}
+    covers = {}
+    counts = {}
+    for db_image, position, image_count in rows:
+        counts[db_image.album_id] = image_count
+        if position <= images_per_album:
+            images[db_image.album_id].append(db_image)
+        covers[db_image.id] = db_image
+
+    gallery = []
+    for album in albums:
+        album_images = images[album.id]
+        cover = covers.get(int(album.cover_image)) if album.cover_image and album.cover_image.isdigit() else None
+        gallery.append({
+            **{field: getattr(album, field) for field in schemas.Album.model_fields},
+            "cover": cover or (album_images[0] if album_images else None),
+            "images": album_images,
+            "image_count": counts.get(album.id, 0),
+        })
+    return gallery
+
+async def create_album(db: AsyncSession, album: schemas.AlbumCreate):
     db_album = models.AlbumModel(**album.dict())
     db.add(db_album)
-    db.commit()
-    db.refresh(db_album)
+    await db.commit()
+    await catalog_cache.invalidate("albums", "statistics")
+    await db.refresh(db_album)
     return db_album
 
-def update_album(db: Session, album_id: int, album: schemas.AlbumUpdate):
-    db_album = get_album(db, album_id)
+async def update_album(db: AsyncSession, album_id: int, album: schemas.AlbumUpdate):
+    db_album = await get_album(db, album_id)
     if db_album:
         for key, value in album.dict(exclude_unset=True).items():
             setattr(db_album, key, value)
-        db.commit()
-        db.refresh(db_album)
+        await db.commit()
+        await catalog_cache.invalidate("albums")
+        await db.refresh(db_album)
     return db_album
 
-def delete_album(db: Session, album_id: int):
-    db_album = get_album(db, album_id)
+async def delete_album(db: AsyncSession, album_id: int):
+    db_album = await get_album(db, album_id)
     if db_album:
-        db.delete(db_album)
-        db.commit()
+        await db.delete(db_album)
+        await db.commit()
+        await catalog_cache.invalidate("albums", "statistics")
         return True
     return False
 
 # 图片相关操作
-def get_images(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.ImageModel).order_by(models.ImageModel.created_at.desc()).offset(skip).limit(limit).all()
+async def get_images(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None):
+    result = await db.scalars(apply_keyset(select(models.ImageModel), models.ImageModel, cursor, skip, limit))
+    return restore_order(result, cursor)
+
+async def get_images_by_album(db: AsyncSession, album_id: int, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None):
+    query = select(models.ImageModel).filter(models.ImageModel.album_id == album_id)
+    result = await db.scalars(apply_keyset(query, models.ImageModel, cursor, skip, limit))
+    return restore_order(result, cursor)
 
-def get_images_by_album(db: Session, album_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.ImageModel).filter(models.ImageModel.album_id == album_id).order_by(models.ImageModel.created_at.desc()).offset(skip).limit(limit).all()
+async def get_image(db: AsyncSession, image_id: int):
+    return await db.scalar(select(models.ImageModel).filter(models.ImageModel.id == image_id))
 
-def get_image(db: Session, image_id: int):
-    return db.query(models.ImageModel).filter(models.ImageModel.id == image_id).first()
+async def count_image_references(db: AsyncSession, object_name: str):
+    """引用同一个存储文件的图片记录数"""
+    return await db.scalar(select(func.count(models.ImageModel.id)).filter(models.ImageModel.object_name == object_name))
 
-def create_image(db: Session, image: schemas.ImageCreate):
-    db_image = models.ImageModel(**image.dict())
+async def create_image(db: AsyncSession, image: schemas.ImageCreate, metadata: Optional[schemas.ImageMetadata] = None):
+    db_image = models.ImageModel(**image.dict(), **(metadata.dict(exclude_unset=True) if metadata else {}))
     db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
+    await db.commit()
+    await catalog_cache.invalidate("albums", "statistics")
+    await db.refresh(db_image)
     return db_image
 
-def update_image(db: Session, image_id: int, image: schemas.ImageUpdate):
-    db_image = get_image(db, image_id)
+async def create_images(db: AsyncSession, images: List[schemas.ImageCreate], metadata: Optional[List[Optional[schemas.ImageMetadata]]] = None):
+    """在一个事务中插入多张图片，返回顺序与参数一致；metadata 与 images 一一对应"""
+    metadata = metadata or [None] * len(images)
+    db_images = [
+        models.ImageModel(**image.dict(), **(info.dict(exclude_unset=True) if info else {}))
+        for image, info in zip(images, metadata)
+    ]
+    if not db_images:
+        return db_images
+    db.add_all(db_images)
+    await db.flush()
+    ids = [db_image.id for db_image in db_images]
+    await db.commit()
+    await catalog_cache.invalidate("albums", "statistics")
+    # 一次查询加载数据库生成的时间字段，代替逐条 refresh
+    await db.execute(
+        select(models.ImageModel).filter(models.ImageModel.id.in_(ids))
+        .execution_options(populate_existing=True)
+    )
+    return db_images
+
+async def update_image(db: AsyncSession, image_id: int, image: schemas.ImageUpdate):
+    db_image = await get_image(db, image_id)
     if db_image:
         for key, value in image.dict(exclude_unset=True).items():
             setattr(db_image, key, value)
-        db.commit()
-        db.refresh(db_image)
+        await db.commit()
+        await catalog_cache.invalidate("albums")
+        await db.refresh(db_image)
     return db_image
 
-def delete_image(db: Session, image_id: int):
-    db_image = get_image(db, image_id)
+async def delete_image(db: AsyncSession, image_id: int):
+    db_image = await get_image(db, image_id)
     if db_image:
-        db.delete(db_image)
-        db.commit()
+        await db.delete(db_image)
+        await db.commit()
+        await catalog_cache.invalidate("albums", "statistics")
         return True
     return False
 
 # 服务相关操作
-def get_services(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.ServiceModel).order_by(models.ServiceModel.order).offset(skip).limit(limit).all()
+@catalog_cache.cached("services", List[schemas.Service])
+async def get_services(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.scalars(select(models.ServiceModel).order_by(models.ServiceModel.order).offset(skip).limit(limit))
+    return result.all()
 
-def get_service(db: Session, service_id: int):
-    return db.query(models.ServiceModel).filter(models.ServiceModel.id == service_id).first()
+async def get_service(db: AsyncSession, service_id: int):
+    return await db.scalar(select(models.ServiceModel).filter(models.ServiceModel.id == service_id))
 
-def create_service(db: Session, service: schemas.ServiceCreate):
+async def create_service(db: AsyncSession, service: schemas.ServiceCreate):
     db_service = models.ServiceModel(**service.dict())
     db.add(db_service)
-    db.commit()
-    db.refresh(db_service)
+    await db.commit()
+    await catalog_cache.invalidate("services", "statistics")
+    await db.refresh(db_service)
     return db_service
 
-def update_service(db: Session, service_id: int, service: schemas.ServiceUpdate):
-    db_service = get_service(db, service_id)
+async def update_service(db: AsyncSession, service_id: int, service: schemas.ServiceUpdate):
+    db_service = await get_service(db, service_id)
     if db_service:
         for key, value in service.dict(exclude_unset=True).items():
             setattr(db_service, key, value)
-        db.commit()
-        db.refresh(db_service)
+        await db.commit()
+        await catalog_cache.invalidate("services")
+        await db.refresh(db_service)
     return db_service
 
-def delete_service(db: Session, service_id: int):
-    db_service = get_service(db, service_id)
+async def reorder_services(db: AsyncSession, service_ids: List[int]):
+    """按 service_ids 的顺序设置 order，一条 UPDATE ... CASE 语句。
+
+    service_ids 必须正好是全部服务，否则其他服务会保留旧的 order；不一致时返回 None。
+    """
+    existing = set(await db.scalars(select(models.ServiceModel.id)))
+    if existing != set(service_ids):
+        return None
+    ordering = case({service_id: index for index, service_id in enumerate(service_ids)}, value=models.ServiceModel.id)
+    result = await db.execute(
+        update(models.ServiceModel).filter(models.ServiceModel.id.in_(service_ids)).values(order=ordering)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(service_ids):
+        await db.rollback()
+        return None
+    await db.commit()
+    await catalog_cache.invalidate("services")
+    result = await db.scalars(
+        select(models.ServiceModel).filter(models.ServiceModel.id.in_(service_ids))
+        .order_by(models.ServiceModel.order).execution_options(populate_existing=True)
+    )
+    return result.all()
+
+async def delete_service(db: AsyncSession, service_id: int):
+    db_service = await get_service(db, service_id)
     if db_service:
-        db.delete(db_service)
-        db.commit()
+        await db.delete(db_service)
+        await db.commit()
+        await catalog_cache.invalidate("services", "statistics")
         return True
     return False
 
+# 批量修改：{字段名: (模型, 需要失效的缓存命名空间)}
+BATCH_UPDATE_MODELS = {
+    "services": (models.ServiceModel, "services"),
+    "albums": (models.AlbumModel, "albums"),
+    "images": (models.ImageModel, "albums"),
+}
+
+async def apply_batch_update(db: AsyncSession, batch: schemas.BatchUpdate):
+    """在一个事务中按主键批量修改服务、相册和图片，每种记录一条 executemany 的 UPDATE。
+
+    有不存在的 id 时回滚并返回 None，否则返回各类修改的记录数。
+    """
+    counts = {}
+    for name, (model, _) in BATCH_UPDATE_MODELS.items():
+        # 只修改请求中给出的字段，没有字段的项忽略
+        rows = [row for row in (item.dict(exclude_unset=True) for item in getattr(batch, name)) if len(row) > 1]
+        counts[name] = len(rows)
+        if not rows:
+            continue
+        ids = {row["id"] for row in rows}
+        if await db.scalar(select(func.count(model.id)).filter(model.id.in_(ids))) != len(ids):
+            await db.rollback()
+            return None
+        await db.execute(update(model), rows)
+    await db.commit()
+    await catalog_cache.invalidate(*{namespace for name, (_, namespace) in BATCH_UPDATE_MODELS.items() if counts[name]})
+    return counts
+
 # 联系表单相关操作
-def get_contacts(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.ContactModel).order_by(models.ContactModel.created_at.desc()).offset(skip).limit(limit).all()
+async def get_contacts(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None):
+    result = await db.scalars(apply_keyset(select(models.ContactModel), models.ContactModel, cursor, skip, limit))
+    return restore_order(result, cursor)
 
-def get_contact(db: Session, contact_id: int):
-    return db.query(models.ContactModel).filter(models.ContactModel.id == contact_id).first()
+async def get_contact(db: AsyncSession, contact_id: int):
+    return await db.scalar(select(models.ContactModel).filter(models.ContactModel.id == contact_id))
 
-def create_contact(db: Session, contact: schemas.ContactRequest):
+async def create_contact(db: AsyncSession, contact: schemas.ContactRequest):
     db_contact = models.ContactModel(**contact.dict())
     db.add(db_contact)
-    db.commit()
-    db.refresh(db_contact)
+    await db.commit()
+    await catalog_cache.invalidate("statistics")
+    await db.refresh(db_contact)
     return db_contact
 
-def update_contact_status(db: Session, contact_id: int, is_read: int):
-    db_contact = get_contact(db, contact_id)
+async def update_contact_status(db: AsyncSession, contact_id: int, is_read: int):
+    db_contact = await get_contact(db, contact_id)
     if db_contact:
         db_contact.is_read = is_read
-        db.commit()
-        db.refresh(db_contact)
+        await db.commit()
+        await catalog_cache.invalidate("statistics")
+        await db.refresh(db_contact)
     return db_contact
 
-def delete_contact(db: Session, contact_id: int):
-    db_contact = get_contact(db, contact_id)
+async def delete_contact(db: AsyncSession, contact_id: int):
+    db_contact = await get_contact(db, contact_id)
     if db_contact:
-        db.delete(db_contact)
-        db.commit()
+        await db.delete(db_contact)
+        await db.commit()
+        await catalog_cache.invalidate("statistics")
         return True
     return False
 
 # 统计相关操作
-def get_statistics(db: Session):
-    album_count = db.query(func.count(models.AlbumModel.id)).scalar()
-    image_count = db.query(func.count(models.ImageModel.id)).scalar()
-    service_count = db.query(func.count(models.ServiceModel.id)).scalar()
-    contact_count = db.query(func.count(models.ContactModel.id)).scalar()
-    unread_contact_count = db.query(func.count(models.ContactModel.id)).filter(models.ContactModel.is_read == 0).scalar()
-    
-    return {
-        "album_count": album_count,
-        "image_count": image_count,
-        "service_count": service_count,
-        "contact_count": contact_count,
-        "unread_contact_count": unread_contact_count
-    } 
\ No newline at end of file
+@catalog_cache.cached("statistics", schemas.Statistics, ttl=STATISTICS_CACHE_TTL)
+async def get_statistics(db: AsyncSession):
+    # 一次查询取得全部计数
+    query = select(
+        select(func.count(models.AlbumModel.id)).scalar_subquery().label("album_count"),
+        select(func.count(models.ImageModel.id)).scalar_subquery().label("image_count"),
+        select(func.count(models.ServiceModel.id)).scalar_subquery().label("service_count"),
+        select(func.count(models.ContactModel.id)).scalar_subquery().label("contact_count"),
+        select(func.count(models.ContactModel.id)).filter(models.ContactModel.is_read == 0).scalar_subquery().label("unread_contact_count"),
+    )
+    return (await db.execute(query)).one()._asdict()
+
+# 全文搜索
+async def search_records(db: AsyncSession, model, q: str, limit: int = 20, cursor: Optional[RankCursor] = None):
+    """按相关度倒序返回 model 的记录，每条记录附带 rank 属性"""
+    result = await db.execute(build_search_query(model, q, limit, cursor))
+    records = []
+    for record, rank in result:
+        record.rank = rank
+        records.append(record)
+    return records
@@ -1,7 +1,13 @@
 import os
-from sqlalchemy import create_engine
+import time
+import threading
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -10,19 +16,176 @@ load_dotenv()
 # 获取数据库连接URL
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-# 创建数据库引擎
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# 数据库访问模式：async（默认）或 sync（兼容模式，在线程池中执行同步会话）
+DB_MODE = os.getenv("DB_MODE", "async").lower()
+
+# 同步驱动到异步驱动的映射
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """把同步连接URL转换为对应的异步驱动URL"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+# 连接池配置
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 秒，-1 表示不回收
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+class PoolTelemetryMixin:
+    """记录借出连接的次数、等待时间和超时次数"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkout_count = 0
+        self.timeout_count = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeout_count += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkout_count += 1
+                self.wait_time_total += elapsed
+                self.wait_time_max = max(self.wait_time_max, elapsed)
+
+class TimedQueuePool(PoolTelemetryMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(PoolTelemetryMixin, AsyncAdaptedQueuePool):
+    pass
+
+def get_pool_options(url: str, poolclass):
+    """根据环境变量生成连接池参数；SQLite 保留驱动默认的连接池"""
+    options = {
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=poolclass,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    return options
+
+def get_pool_stats(target_engine):
+    """读取引擎连接池的实时状态"""
+    pool = target_engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "size": None,
+        "checked_in": None,
+        "checked_out": None,
+        "overflow": None,
+        "max_overflow": None,
+        "timeout": None,
+        "checkouts": None,
+        "timeouts": None,
+        "wait_time_total_ms": None,
+        "wait_time_avg_ms": None,
+        "wait_time_max_ms": None,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, PoolTelemetryMixin):
+        with pool._stats_lock:
+            checkouts = pool.checkout_count
+            stats.update(
+                checkouts=checkouts,
+                timeouts=pool.timeout_count,
+                wait_time_total_ms=pool.wait_time_total * 1000,
+                wait_time_avg_ms=pool.wait_time_total * 1000 / checkouts if checkouts else 0.0,
+                wait_time_max_ms=pool.wait_time_max * 1000,
+            )
+    return stats
+
+# 创建数据库引擎（同步引擎用于建表、迁移和兼容模式）
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **get_pool_options(SQLALCHEMY_DATABASE_URL, TimedQueuePool))
 
 # 创建会话
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 创建异步引擎和会话
+ASYNC_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_pool_options(ASYNC_DATABASE_URL, TimedAsyncAdaptedQueuePool))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 # 创建基类
 Base = declarative_base()
 
+class SyncSessionAdapter:
+    """兼容模式：以 AsyncSession 的接口包装同步会话，阻塞调用放到线程池执行"""
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
 # 获取数据库会话
-def get_db():
-    db = SessionLocal()
+async def get_db():
+    if DB_MODE == "sync":
+        db = SyncSessionAdapter(SessionLocal(expire_on_commit=False))
+    else:
+        db = AsyncSessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        await db.close()
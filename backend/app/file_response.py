@@ -0,0 +1,168 @@
+import os
+import stat
+import uuid
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+
+# 每次从线程池读取的字节数，较大的块减少线程切换
+FILE_CHUNK_SIZE = 256 * 1024
+# 一个请求最多的区间数，超过时返回完整文件，防止大量小区间放大响应
+MAX_RANGES = int(os.getenv("MAX_RANGES", "16"))
+# ASGI 零拷贝扩展，服务器支持时由服务器调用 os.sendfile
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """解析 Range 请求头，返回合并后的闭区间列表。
+
+    格式错误、不是 bytes 单位或区间过多时返回 None（忽略 Range，返回完整文件），
+    全部区间都无法满足时返回空列表（416）。
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return None
+    ranges = []
+    for spec in specs.split(","):
+        first, sep, last = spec.strip().partition("-")
+        first, last = first.strip(), last.strip()
+        if not sep or not (first.isdigit() or first == "") or not (last.isdigit() or last == "") or first == last == "":
+            return None
+        if first == "":
+            # 后缀区间：最后 N 个字节
+            length = int(last)
+            if length == 0:
+                continue
+            ranges.append((max(size - length, 0), size - 1))
+            continue
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, end))
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    # 合并重叠或相邻的区间
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def if_range_matches(if_range: str, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """If-Range 使用强比较：弱 ETag 永远不匹配，日期需与 Last-Modified 完全相同"""
+    if_range = if_range.strip()
+    if if_range.startswith("W/"):
+        return False
+    if etag is not None and if_range == etag:
+        return not etag.startswith("W/")
+    if last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(if_range) == parsedate_to_datetime(last_modified)
+    except (TypeError, ValueError):
+        return False
+
+def _read_at(file, offset: int, length: int) -> bytes:
+    # pread 不改变文件位置，同一个文件可以按区间读取；没有 pread 的平台退回 seek
+    if hasattr(os, "pread"):
+        return os.pread(file.fileno(), length, offset)
+    file.seek(offset)
+    return file.read(length)
+
+class RangeFileResponse(FileResponse):
+    """支持 Range/If-Range 的文件响应：单个区间返回 206，多个区间返回 multipart/byteranges，
+    无法满足时返回 416。服务器支持 ASGI 零拷贝扩展时用 sendfile 传输，否则在线程池中分块读取。
+    """
+
+    async def __call__(self, scope, receive, send):
+        if self.stat_result is None:
+            try:
+                self.stat_result = await run_in_threadpool(os.stat, self.path)
+            except FileNotFoundError:
+                raise RuntimeError(f"File at path {self.path} does not exist.")
+            if not stat.S_ISREG(self.stat_result.st_mode):
+                raise RuntimeError(f"File at path {self.path} is not a file.")
+            self.set_stat_headers(self.stat_result)
+        size = self.stat_result.st_size
+        self.headers["accept-ranges"] = "bytes"
+
+        ranges = None
+        request_headers = Headers(scope=scope)
+        range_header = request_headers.get("range")
+        if range_header and self.status_code == 200:
+            if_range = request_headers.get("if-range")
+            if if_range is None or if_range_matches(if_range, self.headers.get("etag"), self.headers.get("last-modified")):
+                ranges = parse_range(range_header, size)
+
+        if ranges is None:
+            await self._send_parts(scope, send, self.status_code, [(None, 0, size)])
+        elif not ranges:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            await send({"type": "http.response.start", "status": 416, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.headers["content-length"] = str(end - start + 1)
+            await self._send_parts(scope, send, 206, [(None, start, end - start + 1)])
+        else:
+            boundary = uuid.uuid4().hex
+            content_type = self.media_type
+            parts = []
+            for start, end in ranges:
+                part_headers = f"--{boundary}\r\nContent-Type: {content_type}\r\nContent-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                # 每个部分前的分隔行和部分头，除第一个部分外都以上一部分末尾的 CRLF 开始
+                prefix = ("\r\n" if parts else "") + part_headers
+                parts.append((prefix.encode("latin-1"), start, end - start + 1))
+            closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+            self.headers["content-length"] = str(sum(len(prefix) + length for prefix, _, length in parts) + len(closing))
+            await self._send_parts(scope, send, 206, parts, closing)
+
+        if self.background is not None:
+            await self.background()
+
+    async def _send_parts(self, scope, send, status: int, parts, closing: bytes = b""):
+        """parts 为 (前缀字节或 None, 文件偏移, 长度)"""
+        await send({"type": "http.response.start", "status": status, "headers": self.raw_headers})
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        zerocopy = ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        with await run_in_threadpool(open, self.path, "rb") as file:
+            for index, (prefix, offset, length) in enumerate(parts):
+                last_part = index == len(parts) - 1
+                if prefix:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                if zerocopy:
+                    await send({
+                        "type": ZEROCOPY_EXTENSION,
+                        "file": file,
+                        "offset": offset,
+                        "count": length,
+                        "more_body": not (last_part and not closing),
+                    })
+                else:
+                    await self._send_chunks(send, file, offset, length, more_after=not last_part or bool(closing))
+            if closing:
+                await send({"type": "http.response.body", "body": closing})
+
+    async def _send_chunks(self, send, file, offset: int, length: int, more_after: bool):
+        end = offset + length
+        while offset < end:
+            chunk = await run_in_threadpool(_read_at, file, offset, min(FILE_CHUNK_SIZE, end - offset))
+            if not chunk:
+                # 文件在传输过程中被截断
+                raise RuntimeError(f"File at path {self.path} changed during transfer.")
+            offset += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": offset < end or more_after})
+        if length == 0 and not more_after:
+            await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,114 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+# 各路由的 Cache-Control，可通过环境变量覆盖
+# 上传文件按内容哈希命名，内容不会变化，可以长期缓存
+CACHE_CONTROL = {
+    "images": os.getenv("CACHE_CONTROL_IMAGES", "public, max-age=31536000, immutable"),
+    # 衍生图尚未生成、暂时返回原图时不能长期缓存
+    "images_pending": os.getenv("CACHE_CONTROL_IMAGES_PENDING", "public, no-cache"),
+    "albums": os.getenv("CACHE_CONTROL_ALBUMS", "public, no-cache"),
+    "services": os.getenv("CACHE_CONTROL_SERVICES", "public, no-cache"),
+}
+
+# 文件内容哈希缓存 {(路径, 修改时间, 大小): 哈希}
+FILE_HASH_CACHE_SIZE = 4096
+_file_hashes = OrderedDict()
+_file_hashes_lock = threading.Lock()
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def file_etag(path: str) -> str:
+    """基于文件内容的强 ETag，按修改时间和大小缓存哈希结果"""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        if key in _file_hashes:
+            _file_hashes.move_to_end(key)
+            return _file_hashes[key]
+    etag = f'"{(await run_in_threadpool(_hash_file, path))[:32]}"'
+    with _file_hashes_lock:
+        _file_hashes[key] = etag
+        if len(_file_hashes) > FILE_HASH_CACHE_SIZE:
+            _file_hashes.popitem(last=False)
+    return etag
+
+def file_last_modified(path: str) -> datetime:
+    return datetime.fromtimestamp(os.stat(path).st_mtime, tz=timezone.utc)
+
+def rows_validators(*rows, version: Optional[int] = None):
+    """根据记录的 id 和 updated_at 生成 ETag 和 Last-Modified，无需序列化响应体。
+
+    SQLite 的 CURRENT_TIMESTAMP 只精确到秒，同一秒内的两次修改 updated_at 相同；
+    version 传入 catalog_cache 命名空间的版本号（每次写入递增，需在查询之前读取），使 ETag 随之变化。
+    """
+    digest = hashlib.sha256()
+    if version is not None:
+        digest.update(f"v{version};".encode())
+    last_modified = None
+    for row in rows:
+        updated_at = getattr(row, "updated_at", None) or getattr(row, "created_at", None)
+        digest.update(f"{type(row).__name__}:{row.id}:{updated_at.isoformat() if updated_at else ''};".encode())
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    if last_modified is not None and last_modified.tzinfo is None:
+        # 数据库时间不带时区，按 UTC 解释（只用于和客户端回传的值比较）
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return f'"{digest.hexdigest()[:32]}"', last_modified
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match 使用弱比较
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(_strip_weak(tag) == _strip_weak(etag) for tag in candidates)
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """判断客户端缓存是否仍然有效；If-None-Match 存在时忽略 If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def validator_headers(etag: str, last_modified: Optional[datetime], route: str) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL[route]}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+def conditional(request: Request, response: Response, etag: str, last_modified: Optional[datetime], route: str):
+    """设置验证器；缓存有效时返回 304 响应，否则返回 None 由路由继续返回数据。
+
+    路由已经设置在 response 上的头（如游标分页的 X-Next-Cursor）也带到 304 响应中，
+    客户端用缓存的页面时仍能拿到翻页链接。
+    """
+    headers = validator_headers(etag, last_modified, route)
+    if is_not_modified(request, etag, last_modified):
+        carried = {name: value for name, value in response.headers.items() if name not in ("content-length", "content-type")}
+        return Response(status_code=304, headers={**carried, **headers})
+    response.headers.update(headers)
+    return None
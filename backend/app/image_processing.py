@@ -0,0 +1,233 @@
+import os
+import io
+import base64
+import asyncio
+import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps, ExifTags
+from . import models, object_storage, compression
+from .database import SessionLocal
+from .cache import catalog_cache
+from .log import get_logger
+
+# AVIF 编码器可选：Pillow 未内置时尝试加载 pillow-avif-plugin
+try:
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+Image.init()
+
+logger = get_logger(__name__)
+
+# 衍生图尺寸（最长边像素），原图尺寸不超过时直接使用原图
+DERIVATIVE_SIZES = {
+    models.ImageSize.THUMB: int(os.getenv("IMAGE_THUMB_SIZE", "320")),
+    models.ImageSize.MEDIUM: int(os.getenv("IMAGE_MEDIUM_SIZE", "1280")),
+    models.ImageSize.FULL: int(os.getenv("IMAGE_FULL_SIZE", "2560")),
+}
+
+# 现代格式转码配置，按优先级排列 {格式: (MIME 类型, Pillow 格式, 编码参数)}
+MODERN_FORMATS = {
+    "avif": ("image/avif", "AVIF", {"quality": int(os.getenv("AVIF_QUALITY", "60"))}),
+    "webp": ("image/webp", "WEBP", {"quality": int(os.getenv("WEBP_QUALITY", "80")), "method": 4}),
+}
+for name, (mime_type, _, _) in MODERN_FORMATS.items():
+    mimetypes.add_type(mime_type, f".{name}")
+AVAILABLE_FORMATS = [name for name, (_, pil_format, _) in MODERN_FORMATS.items() if pil_format in Image.SAVE]
+
+# 占位图最长边像素，base64 后约几百字节，直接内嵌在接口响应中
+PLACEHOLDER_SIZE = int(os.getenv("IMAGE_PLACEHOLDER_SIZE", "16"))
+PLACEHOLDER_FORMAT = "WEBP" if "WEBP" in Image.SAVE else "JPEG"
+# EXIF 方向为 5-8 时图片需要旋转 90 度，宽高互换
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+# 后台处理线程池（Pillow 在缩放和编码时会释放 GIL）
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image-worker")
+# 请求时的懒转码使用独立线程池，不与上传后的衍生图任务互相排队
+TRANSCODE_WORKERS = int(os.getenv("TRANSCODE_WORKERS", "2"))
+transcode_executor = ThreadPoolExecutor(max_workers=TRANSCODE_WORKERS, thread_name_prefix="transcode-worker")
+
+def derivative_path(source_path: str, size: models.ImageSize) -> str:
+    """衍生图与原图存放在同一目录，例如 uploads/6/20250416190758_thumb.png"""
+    stem, ext = os.path.splitext(source_path)
+    return f"{stem}_{size.value}{ext}"
+
+def _save(image: Image.Image, path: str, image_format: str):
+    if image_format == "JPEG":
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        options = {"quality": 85, "optimize": True, "progressive": True}
+    elif image_format == "PNG":
+        options = {"optimize": True}
+    else:
+        options = {}
+        for _, pil_format, encode_options in MODERN_FORMATS.values():
+            if image_format == pil_format:
+                options = encode_options
+    # 先写临时文件再替换，避免读到写了一半的图片
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    image.save(temp_path, format=image_format, **options)
+    os.replace(temp_path, path)
+
+def generate_derivatives(source_path: str) -> dict:
+    """生成各尺寸衍生图，返回 {尺寸: 文件路径}"""
+    derivatives = {}
+    with Image.open(source_path) as source:
+        # 手机拍摄的 MPO 按 JPEG 保存
+        image_format = "JPEG" if source.format == "MPO" else source.format
+        image = ImageOps.exif_transpose(source)
+        for size, max_edge in DERIVATIVE_SIZES.items():
+            if max(image.size) <= max_edge:
+                derivatives[size.value] = source_path
+                continue
+            path = derivative_path(source_path, size)
+            # 相同内容的重复上传共享同一个 blob，衍生图已存在时直接复用
+            if not os.path.exists(path):
+                variant = image.copy()
+                variant.thumbnail((max_edge, max_edge), Image.LANCZOS)
+                _save(variant, path, image_format)
+            derivatives[size.value] = path
+    return derivatives
+
+def _placeholder(source: Image.Image) -> str:
+    """缩小到 PLACEHOLDER_SIZE 的低质量占位图，返回 data URI"""
+    # JPEG 解码时直接按比例缩小，不需要解码完整尺寸
+    source.draft("RGB", (PLACEHOLDER_SIZE * 8, PLACEHOLDER_SIZE * 8))
+    image = ImageOps.exif_transpose(source)
+    image = image.convert("RGBA" if "A" in image.getbands() and PLACEHOLDER_FORMAT == "WEBP" else "RGB")
+    image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BILINEAR)
+    buffer = io.BytesIO()
+    image.save(buffer, format=PLACEHOLDER_FORMAT, quality=40)
+    mime_type = Image.MIME[PLACEHOLDER_FORMAT]
+    return f"data:{mime_type};base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+def read_image_info(source_path: str, with_placeholder: bool = False) -> dict:
+    """读取宽高和 MIME 类型（只解析文件头）；with_placeholder 时同时生成占位图。
+
+    不是图片时抛出 PIL.UnidentifiedImageError。
+    """
+    with Image.open(source_path) as source:
+        image_format = "JPEG" if source.format == "MPO" else source.format
+        width, height = source.size
+        if source.getexif().get(ExifTags.Base.Orientation) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+        info = {"width": width, "height": height, "mime_type": Image.MIME.get(image_format)}
+        if with_placeholder:
+            info["placeholder"] = _placeholder(source)
+    return info
+
+def process_image(image_id: int, source_path: str):
+    """在工作线程中生成衍生图和占位图并写回图片记录"""
+    try:
+        local_path = object_storage.backend.fetch(source_path)
+        derivatives = generate_derivatives(local_path)
+        for path in set(derivatives.values()) - {source_path}:
+            object_storage.backend.put(path)
+        info = read_image_info(local_path, with_placeholder=True)
+        info["file_size"] = os.path.getsize(local_path)
+    except Exception:
+        logger.exception("生成衍生图时出错", extra={"image_id": image_id, "source_path": source_path})
+        return
+    db = SessionLocal()
+    try:
+        db_image = db.get(models.ImageModel, image_id)
+        if db_image:
+            db_image.derivatives = derivatives
+            for key, value in info.items():
+                setattr(db_image, key, value)
+            db.commit()
+            catalog_cache.invalidate_sync("albums")
+    finally:
+        db.close()
+
+def schedule_derivatives(image_id: int, source_path: str):
+    """提交到后台线程池，不阻塞上传请求"""
+    return executor.submit(process_image, image_id, source_path)
+
+def get_variant_path(db_image: models.ImageModel, size: models.ImageSize = None) -> str:
+    """返回指定尺寸的文件路径；衍生图尚未生成时返回原图"""
+    if size and db_image.derivatives:
+        path = db_image.derivatives.get(size.value)
+        if path and object_storage.backend.exists(path):
+            return path
+    return db_image.object_name
+
+def negotiate_format(accept: str):
+    """根据 Accept 请求头选择客户端支持的现代格式，都不支持时返回 None"""
+    accepted = {}
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[media_type.strip().lower()] = quality
+    for name in AVAILABLE_FORMATS:
+        if accepted.get(MODERN_FORMATS[name][0], 0) > 0:
+            return name
+    return None
+
+def transcoded_path(source_path: str, image_format: str) -> str:
+    """保留原扩展名，例如 <哈希>.jpg.webp：相同内容可能另有一个 <哈希>.webp 的 blob，不能共用路径"""
+    return f"{source_path}.{image_format}"
+
+def _cached_transcode(source_path: str, image_format: str):
+    """本地已有比原图新的转码缓存时返回其路径，否则返回 None"""
+    path = transcoded_path(source_path, image_format)
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(source_path):
+            return path
+    except FileNotFoundError:
+        pass
+    return None
+
+def transcode(source_path: str, image_format: str) -> str:
+    """转码并缓存到磁盘，缓存比原图新时直接复用"""
+    object_storage.backend.fetch(source_path)
+    path = _cached_transcode(source_path, image_format)
+    if path is not None:
+        return path
+    path = transcoded_path(source_path, image_format)
+    with Image.open(source_path) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        _save(image, path, MODERN_FORMATS[image_format][1])
+    object_storage.backend.put(path)
+    return path
+
+async def get_transcoded_path(source_path: str, image_format: str) -> str:
+    """懒转码：已缓存时直接返回，否则在转码线程池中生成；转码失败或结果更大时返回原文件"""
+    if os.path.splitext(source_path)[1].lower().lstrip(".") == image_format:
+        return source_path
+    # 命中缓存只需两次 stat，不占用线程池
+    path = _cached_transcode(source_path, image_format)
+    if path is None:
+        try:
+            loop = asyncio.get_running_loop()
+            path = await loop.run_in_executor(transcode_executor, transcode, source_path, image_format)
+        except Exception:
+            logger.exception("转码图片时出错", extra={"source_path": source_path, "format": image_format})
+            return source_path
+    if os.path.getsize(path) >= os.path.getsize(source_path):
+        return source_path
+    return path
+
+def remove_image_files(db_image: models.ImageModel):
+    """删除原图、全部衍生图和转码缓存"""
+    paths = {db_image.object_name}
+    paths.update((db_image.derivatives or {}).values())
+    for path in list(paths):
+        paths.update(transcoded_path(path, name) for name in MODERN_FORMATS)
+    object_storage.backend.delete(paths)
+    compression.remove_precompressed(paths)
+
+def shutdown():
+    transcode_executor.shutdown(wait=True)
+    executor.shutdown(wait=True)
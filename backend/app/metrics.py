@@ -0,0 +1,208 @@
+import os
+import time
+import bisect
+import threading
+import contextvars
+from sqlalchemy import event
+from .database import engine, async_engine, get_pool_stats
+from .file_response import ZEROCOPY_EXTENSION
+
+# 设置为 false 时不注册中间件和 /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+INF_BOUND = 'le="+Inf"'
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # {标签值: [各区间计数..., 总和, 总数]}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(label_values, list(series)) for label_values, series in self._values.items()]
+        bounds = [f'le="{bound}"' for bound in self.buckets]
+        for label_values, series in items:
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, bound)} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(self.labels, label_values, INF_BOUND)} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(float(series[-2]))}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}"
+
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "请求处理时间", ("method", "route"))
+REQUESTS = Counter("http_requests_total", "请求数", ("method", "route", "status"))
+REQUEST_SIZE = Histogram("http_request_size_bytes", "请求体大小", ("method", "route"), SIZE_BUCKETS)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "响应体大小", ("method", "route"), SIZE_BUCKETS)
+DB_QUERIES = Counter("db_queries_total", "SQL 语句数", ("route", "operation"))
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "SQL 语句执行时间", ("route", "operation"))
+METRICS = (REQUEST_DURATION, REQUESTS, REQUEST_SIZE, RESPONSE_SIZE, DB_QUERIES, DB_QUERY_DURATION)
+
+def route_label(scope) -> str:
+    """路由模板（如 /api/albums/{album_id}），避免按实际路径产生过多标签"""
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+class RequestStats:
+    """一个请求内的数据库统计，由 SQLAlchemy 事件累加"""
+
+    __slots__ = ("scope", "queries", "db_time")
+
+    def __init__(self, scope):
+        # 路由匹配后 scope 中才有 route，使用时再读取
+        self.scope = scope
+        self.queries = 0
+        self.db_time = 0.0
+
+# 线程池和 greenlet 中执行的语句沿用请求的上下文
+_request_stats = contextvars.ContextVar("request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    stats = _request_stats.get()
+    # 后台线程（衍生图等）中的语句没有请求上下文
+    route = route_label(stats.scope) if stats is not None else "background"
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+    DB_QUERIES.inc(route, operation)
+    DB_QUERY_DURATION.observe(elapsed, route, operation)
+
+def _handle_error(exception_context):
+    # 语句出错时不会触发 after_cursor_execute
+    started = exception_context.connection.info.get("query_started") if exception_context.connection is not None else None
+    if started:
+        started.pop()
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine, "handle_error", _handle_error)
+
+class MetricsMiddleware:
+    """记录各路由的延迟、请求和响应大小、状态码，并在 Server-Timing 中返回数据库耗时"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        status = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, response_size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", app;dur={total_ms:.1f}'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            elif message["type"] == ZEROCOPY_EXTENSION:
+                # 零拷贝传输没有 body，按文件区间长度计算；没有 count 时发送到文件末尾
+                count = message.get("count")
+                if count is None:
+                    count = os.fstat(message["file"].fileno()).st_size - message.get("offset", 0)
+                response_size += count
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route_path = route_label(scope)
+            method = scope["method"]
+            request_size = 0
+            for name, value in scope.get("headers", []):
+                if name == b"content-length":
+                    request_size = int(value) if value.isdigit() else 0
+            REQUEST_DURATION.observe(time.perf_counter() - started, method, route_path)
+            REQUESTS.inc(method, route_path, str(status))
+            REQUEST_SIZE.observe(request_size, method, route_path)
+            RESPONSE_SIZE.observe(response_size, method, route_path)
+
+def _pool_gauges():
+    """连接池状态，按引擎区分"""
+    names = {
+        "size": "连接池大小",
+        "checked_out": "已借出的连接数",
+        "overflow": "溢出连接数",
+        "checkouts": "借出连接总次数",
+        "timeouts": "等待连接超时次数",
+    }
+    pools = {"async": get_pool_stats(async_engine), "sync": get_pool_stats(engine)}
+    for field, help in names.items():
+        metric = f"db_pool_{field}"
+        yield f"# HELP {metric} {help}"
+        yield f"# TYPE {metric} gauge"
+        for name, stats in pools.items():
+            if stats[field] is not None:
+                yield f'{metric}{{engine="{name}"}} {stats[field]}'
+
+def render() -> str:
+    """Prometheus 文本格式（仅当前进程）"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(_pool_gauges())
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, func
+import functools
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, Index, DDL, event, func, literal
 from sqlalchemy.orm import relationship
 import enum
 from .database import Base
@@ -9,6 +10,12 @@ class LabelEnum(str, enum.Enum):
     BUSINESS = "business"
     HOUSE = "house"
 
+# 图片尺寸枚举类型
+class ImageSize(str, enum.Enum):
+    THUMB = "thumb"
+    MEDIUM = "medium"
+    FULL = "full"
+
 # SQLAlchemy 模型
 class AlbumModel(Base):
     __tablename__ = "albums"
@@ -23,6 +30,12 @@ class AlbumModel(Base):
     
     # 关系
     images = relationship("ImageModel", back_populates="album", cascade="all, delete-orphan")
+    
+    # 列表、按标签筛选和游标分页索引
+    __table_args__ = (
+        Index("ix_albums_created_at_id", "created_at", "id"),
+        Index("ix_albums_label_created_at_id", "label", "created_at", "id"),
+    )
 
 class ImageModel(Base):
     __tablename__ = "images"
@@ -31,12 +44,25 @@ class ImageModel(Base):
     image_name = Column(String(255), nullable=False)
     object_name = Column(String(255), nullable=False)  # 存储路径或对象存储键
     description = Column(Text, nullable=True)
+    derivatives = Column(JSON, nullable=True)  # 衍生图路径 {尺寸: 路径}
+    # 图片信息，前端据此预留布局空间并先显示占位图
+    width = Column(Integer, nullable=True)  # 按 EXIF 方向旋转后的像素尺寸
+    height = Column(Integer, nullable=True)
+    file_size = Column(Integer, nullable=True)  # 字节
+    mime_type = Column(String(50), nullable=True)
+    placeholder = Column(Text, nullable=True)  # 低质量占位图（base64 data URI）
     album_id = Column(Integer, ForeignKey("albums.id"), nullable=False)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # 关系
     album = relationship("AlbumModel", back_populates="images")
+    
+    # 游标分页索引（album_id 开头的索引同时覆盖按相册筛选和外键级联）
+    __table_args__ = (
+        Index("ix_images_created_at_id", "created_at", "id"),
+        Index("ix_images_album_id_created_at_id", "album_id", "created_at", "id"),
+    )
 
 class ServiceModel(Base):
     __tablename__ = "services"
@@ -48,6 +74,11 @@ class ServiceModel(Base):
     order = Column(Integer, default=0)  # 显示顺序
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # 按显示顺序排序的索引
+    __table_args__ = (
+        Index("ix_services_order", "order"),
+    )
 
 class ContactModel(Base):
     __tablename__ = "contacts"
@@ -58,4 +89,55 @@ class ContactModel(Base):
     email = Column(String(100), nullable=False)
     message = Column(Text, nullable=False)
     is_read = Column(Integer, default=0)  # 0表示未读，1表示已读
-    created_at = Column(DateTime, default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now())
+    
+    # 游标分页索引和未读消息的部分索引
+    __table_args__ = (
+        Index("ix_contacts_created_at_id", "created_at", "id"),
+        Index("ix_contacts_unread", "id", postgresql_where=is_read == 0, sqlite_where=is_read == 0),
+    )
+
+# 全文搜索：各表参与搜索的列
+SEARCH_COLUMNS = {
+    AlbumModel: ("album_name", "description"),
+    ImageModel: ("image_name", "description"),
+    ContactModel: ("name", "phone", "email", "message"),
+}
+
+def search_document(model):
+    """参与搜索的列拼接成的文本；常量直接写入 SQL，PostgreSQL 才能匹配表达式索引"""
+    columns = [func.coalesce(model.__table__.c[name], literal("", literal_execute=True)) for name in SEARCH_COLUMNS[model]]
+    return functools.reduce(lambda left, right: left + literal(" ", literal_execute=True) + right, columns)
+
+def search_vector(model):
+    # 'simple' 配置不做词干处理，中文主要依靠三元组索引
+    return func.to_tsvector(literal("simple", literal_execute=True), search_document(model))
+
+def sqlite_fts_ddl(table: str, columns) -> list:
+    """SQLite FTS5 外部内容表（trigram 分词，支持中文子串）及同步触发器"""
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{name}" for name in columns)
+    old_values = ", ".join(f"old.{name}" for name in columns)
+    delete_old = f"INSERT INTO {table}_fts({table}_fts, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {table}_fts(rowid, {names}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5({names}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')",
+    ]
+
+# PostgreSQL：tsvector 和三元组（pg_trgm）GIN 表达式索引
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+for _model, _columns in SEARCH_COLUMNS.items():
+    _table = _model.__tablename__
+    Index(f"ix_{_table}_search_tsv", search_vector(_model), postgresql_using="gin").ddl_if(dialect="postgresql")
+    Index(
+        f"ix_{_table}_search_trgm", search_document(_model).label("document"),
+        postgresql_using="gin", postgresql_ops={"document": "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+    # SQLite：FTS5 虚拟表
+    for _statement in sqlite_fts_ddl(_table, _columns):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(_model.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {_table}_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,137 @@
+import os
+import uuid
+import mimetypes
+from typing import Iterable, Optional
+from .http_cache import CACHE_CONTROL
+
+# 图片文件存储后端：local（默认，uploads/ 目录）或 s3（S3 兼容的对象存储，如 MinIO）
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None  # 为空时使用 AWS
+S3_REGION = os.getenv("S3_REGION") or None
+S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID") or None
+S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY") or None
+S3_PRESIGN_EXPIRES = int(os.getenv("S3_PRESIGN_EXPIRES", "3600"))  # 秒
+
+# 图片文件返回方式：
+#   stream   - 由 Python 进程读取文件返回
+#   accel    - 返回 X-Accel-Redirect，由 nginx 读取本地文件
+#   redirect - 302 跳转到预签名 URL（仅 s3）
+IMAGE_SERVE_MODE = os.getenv("IMAGE_SERVE_MODE", "redirect" if STORAGE_BACKEND == "s3" else "stream")
+ACCEL_REDIRECT_PREFIX = os.getenv("ACCEL_REDIRECT_PREFIX", "/internal/")
+# 预签名 URL 过期前浏览器可以复用跳转结果
+REDIRECT_CACHE_CONTROL = f"private, max-age={S3_PRESIGN_EXPIRES // 2}"
+
+class LocalStorage:
+    """文件直接保存在本地目录，对象键就是相对路径"""
+
+    def put(self, path: str):
+        pass
+
+    def fetch(self, path: str) -> str:
+        return path
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def delete(self, paths: Iterable[str]):
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def presigned_url(self, path: str) -> Optional[str]:
+        return None
+
+class S3Storage(LocalStorage):
+    """S3 兼容的对象存储，对象键与本地相对路径相同。
+
+    本地目录作为缓存：上传和生成衍生图先写本地文件再上传，
+    需要读取文件内容（生成衍生图、转码）时按需下载到本地。
+    """
+
+    def __init__(self, bucket: str = S3_BUCKET, endpoint_url: Optional[str] = S3_ENDPOINT_URL):
+        import boto3
+        from botocore.exceptions import ClientError
+
+        self.bucket = bucket
+        self._client_error = ClientError
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=S3_REGION,
+            aws_access_key_id=S3_ACCESS_KEY_ID,
+            aws_secret_access_key=S3_SECRET_ACCESS_KEY,
+        )
+
+    @staticmethod
+    def key(path: str) -> str:
+        return path.replace(os.sep, "/")
+
+    def _is_missing(self, error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def put(self, path: str):
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        # 对象按内容哈希命名，内容不会变化
+        self._client.upload_file(path, self.bucket, self.key(path), ExtraArgs={
+            "ContentType": content_type,
+            "CacheControl": CACHE_CONTROL["images"],
+        })
+
+    def fetch(self, path: str) -> str:
+        """确保本地缓存中有该文件，返回本地路径；对象不存在时抛出 FileNotFoundError"""
+        if os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.download"
+        try:
+            self._client.download_file(self.bucket, self.key(path), temp_path)
+        except BaseException as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if isinstance(e, self._client_error) and self._is_missing(e):
+                raise FileNotFoundError(path)
+            raise
+        # 下载完成后再放到缓存路径，并发请求不会读到写了一半的文件
+        os.replace(temp_path, path)
+        return path
+
+    def exists(self, path: str) -> bool:
+        if os.path.exists(path):
+            return True
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self.key(path))
+        except self._client_error as e:
+            if self._is_missing(e):
+                return False
+            raise
+        return True
+
+    def delete(self, paths: Iterable[str]):
+        paths = list(paths)
+        # 同时删除本地缓存
+        super().delete(paths)
+        if paths:
+            self._client.delete_objects(Bucket=self.bucket, Delete={
+                "Objects": [{"Key": self.key(path)} for path in paths],
+                "Quiet": True,
+            })
+
+    def presigned_url(self, path: str) -> Optional[str]:
+        return self._client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self.key(path)},
+            ExpiresIn=S3_PRESIGN_EXPIRES,
+        )
+
+def create_backend(name: str = STORAGE_BACKEND):
+    if name == "s3":
+        return S3Storage()
+    return LocalStorage()
+
+def accel_redirect_path(path: str) -> str:
+    """nginx internal location 中对应的路径，例如 /internal/uploads/blobs/3f/3f2a...jpg"""
+    return ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + path.replace(os.sep, "/").lstrip("/")
+
+# 图片原图、衍生图和转码缓存的存储后端
+backend = create_backend()
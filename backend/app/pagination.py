@@ -0,0 +1,114 @@
+import json
+import base64
+from datetime import datetime
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import DateTime, String, literal, tuple_
+from sqlalchemy.types import TypeDecorator
+
+# 游标方向
+NEXT = "next"
+PREV = "prev"
+
+class SQLiteTimestamp(TypeDecorator):
+    """SQLite 把时间存为文本，func.now() 写入的是 'YYYY-MM-DD HH:MM:SS'，没有微秒；
+    默认的 DateTime 绑定为 'YYYY-MM-DD HH:MM:SS.000000'，按字符串比较时永远对不上。
+    游标中的时间按存储的格式绑定，只有带微秒的值才输出微秒。
+    """
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return value.isoformat(sep=" ", timespec="microseconds" if value.microsecond else "seconds")
+
+# 游标时间的绑定类型，其他数据库按原生时间类型比较
+CURSOR_TIMESTAMP = DateTime().with_variant(SQLiteTimestamp(), "sqlite")
+
+class Cursor(NamedTuple):
+    """按 (created_at, id) 倒序分页的位置"""
+    created_at: datetime
+    id: int
+    direction: str = NEXT
+
+class RankCursor(NamedTuple):
+    """搜索结果按 (rank, id) 倒序分页的位置"""
+    rank: float
+    id: int
+
+def _encode(payload: dict) -> str:
+    data = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+def _decode(value: str) -> dict:
+    padded = value + "=" * (-len(value) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+def encode_cursor(row, direction: str) -> str:
+    return _encode({"c": row.created_at.isoformat(), "i": row.id, "d": direction})
+
+def decode_cursor(value: str) -> Cursor:
+    payload = _decode(value)
+    direction = payload.get("d", NEXT)
+    if direction not in (NEXT, PREV):
+        raise ValueError(direction)
+    return Cursor(datetime.fromisoformat(payload["c"]), int(payload["i"]), direction)
+
+def cursor_param(cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor / X-Prev-Cursor 的值，传入时忽略 skip")):
+    """路由依赖：解析不透明游标，格式错误时返回 400"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="分页游标无效")
+
+def encode_rank_cursor(rank: float, id: int) -> str:
+    return _encode({"r": rank, "i": id})
+
+def decode_rank_cursor(value: str) -> RankCursor:
+    payload = _decode(value)
+    return RankCursor(float(payload["r"]), int(payload["i"]))
+
+def rank_cursor_param(cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值")):
+    """路由依赖：解析搜索结果的游标，格式错误时返回 400"""
+    if cursor is None:
+        return None
+    try:
+        return decode_rank_cursor(cursor)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="分页游标无效")
+
+def apply_keyset(query, model, cursor: Optional[Cursor], skip: int, limit: int):
+    """没有游标时沿用 skip/limit；有游标时按 (created_at, id) 定位，不再扫描跳过的行"""
+    key = tuple_(model.created_at, model.id)
+    if cursor is None:
+        return query.order_by(model.created_at.desc(), model.id.desc()).offset(skip).limit(limit)
+    position = tuple_(literal(cursor.created_at, CURSOR_TIMESTAMP), cursor.id)
+    if cursor.direction == PREV:
+        return query.filter(key > position).order_by(model.created_at.asc(), model.id.asc()).limit(limit)
+    return query.filter(key < position).order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+
+def restore_order(rows, cursor: Optional[Cursor]):
+    """向前翻页时查询是正序的，恢复为倒序"""
+    rows = list(rows)
+    if cursor is not None and cursor.direction == PREV:
+        rows.reverse()
+    return rows
+
+def set_cursor_headers(response: Response, rows, cursor: Optional[Cursor], skip: int, limit: int):
+    """在响应头中返回下一页和上一页的游标，响应体保持列表格式"""
+    if not rows:
+        return
+    backwards = cursor is not None and cursor.direction == PREV
+    full_page = len(rows) >= limit
+    if full_page or backwards:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1], NEXT)
+    if (full_page and backwards) or (not backwards and (cursor is not None or skip > 0)):
+        response.headers["X-Prev-Cursor"] = encode_cursor(rows[0], PREV)
+
+def set_rank_cursor_header(response: Response, rows, limit: int):
+    """搜索结果满一页时在 X-Next-Cursor 中返回最后一条的 (rank, id)"""
+    if rows and len(rows) >= limit:
+        response.headers["X-Next-Cursor"] = encode_rank_cursor(rows[-1].rank, rows[-1].id)
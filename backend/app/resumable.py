@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import hashlib
+from typing import AsyncIterator, NamedTuple, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from . import storage
+from .log import get_logger
+
+# fcntl 只在 POSIX 上可用；没有时不加锁，同一会话的分块需由客户端顺序上传
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# 断点续传配置
+RESUMABLE_UPLOAD_EXPIRES = int(os.getenv("RESUMABLE_UPLOAD_EXPIRES", str(24 * 3600)))  # 会话闲置多少秒后过期
+RESUMABLE_CLEANUP_INTERVAL = int(os.getenv("RESUMABLE_CLEANUP_INTERVAL", "3600"))  # 清理过期会话的间隔秒数
+
+# 会话目录与 blob 在同一文件系统，完成后可以原子替换为 blob
+SESSION_DIR = os.path.join(storage.STAGING_DIR, "sessions")
+INFO_FILE = "info.json"
+DATA_FILE = "data"
+
+class SessionBusy(Exception):
+    """另一个请求（可能在其他 worker 中）正在写入同一会话"""
+
+class OffsetMismatch(Exception):
+    """Upload-Offset 与已接收的字节数不一致"""
+
+    def __init__(self, offset: int):
+        super().__init__(offset)
+        self.offset = offset
+
+class UploadSession(NamedTuple):
+    id: str
+    album_id: int
+    filename: str
+    description: Optional[str]
+    length: int
+    offset: int
+    expires_at: float
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.length
+
+def _session_path(upload_id: str, name: str = "") -> str:
+    return os.path.join(SESSION_DIR, upload_id, name)
+
+def _valid_id(upload_id: str) -> bool:
+    # 会话 ID 用作目录名，只接受 uuid4().hex
+    return len(upload_id) == 32 and all(c in "0123456789abcdef" for c in upload_id)
+
+def _write_info(upload_id: str, info: dict):
+    # 先写临时文件再替换，读取方不会读到写了一半的 JSON
+    temp_path = _session_path(upload_id, f"{INFO_FILE}.tmp")
+    with open(temp_path, "w") as f:
+        json.dump(info, f)
+    os.replace(temp_path, _session_path(upload_id, INFO_FILE))
+
+def _create(album_id: int, filename: str, length: int, description: Optional[str]) -> UploadSession:
+    upload_id = uuid.uuid4().hex
+    os.makedirs(_session_path(upload_id))
+    open(_session_path(upload_id, DATA_FILE), "wb").close()
+    info = {
+        "album_id": album_id,
+        "filename": filename,
+        "description": description,
+        "length": length,
+        "expires_at": time.time() + RESUMABLE_UPLOAD_EXPIRES,
+    }
+    _write_info(upload_id, info)
+    return UploadSession(id=upload_id, offset=0, **info)
+
+def _load(upload_id: str) -> Optional[UploadSession]:
+    """读取会话，已接收的字节数即数据文件大小；不存在或已过期时返回 None"""
+    if not _valid_id(upload_id):
+        return None
+    try:
+        with open(_session_path(upload_id, INFO_FILE)) as f:
+            info = json.load(f)
+        offset = os.path.getsize(_session_path(upload_id, DATA_FILE))
+    except (FileNotFoundError, ValueError):
+        return None
+    if info["expires_at"] < time.time():
+        shutil.rmtree(_session_path(upload_id), ignore_errors=True)
+        return None
+    return UploadSession(id=upload_id, offset=offset, **info)
+
+def _remove(upload_id: str) -> bool:
+    if not _valid_id(upload_id) or not os.path.isdir(_session_path(upload_id)):
+        return False
+    shutil.rmtree(_session_path(upload_id), ignore_errors=True)
+    return True
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(storage.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _touch(session: UploadSession) -> Optional[UploadSession]:
+    # 每次收到分块后延长过期时间，只有闲置的会话会过期
+    info = session._asdict()
+    del info["id"], info["offset"]
+    info["expires_at"] = time.time() + RESUMABLE_UPLOAD_EXPIRES
+    try:
+        _write_info(session.id, info)
+    except FileNotFoundError:
+        # 写入过程中会话被删除
+        return None
+    return session._replace(expires_at=info["expires_at"])
+
+def _acquire(upload_id: str) -> Optional[int]:
+    """以追加方式打开数据文件并加排他文件锁，返回文件描述符；会话不存在时返回 None。
+
+    flock 跨进程生效，多个 uvicorn worker 收到同一会话的请求时只有一个能写入。
+    不等待锁：另一个请求正在上传时抛出 SessionBusy，客户端稍后查询 offset 再继续。
+    """
+    if not _valid_id(upload_id):
+        return None
+    try:
+        fd = os.open(_session_path(upload_id, DATA_FILE), os.O_WRONLY | os.O_APPEND)
+    except FileNotFoundError:
+        return None
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise SessionBusy(upload_id)
+    return fd
+
+def _stage_copy(upload_id: str) -> str:
+    """把数据文件硬链接到暂存目录。create_image_from_staged 失败时只删除这个链接，会话文件保留，可以重试"""
+    staged_path = os.path.join(storage.STAGING_DIR, f".{uuid.uuid4().hex}.part")
+    os.link(_session_path(upload_id, DATA_FILE), staged_path)
+    return staged_path
+
+def _write(fd: int, chunk: bytes):
+    view = memoryview(chunk)
+    while view:
+        view = view[os.write(fd, view):]
+
+async def create_session(album_id: int, filename: str, length: int, description: Optional[str] = None) -> UploadSession:
+    """创建上传会话，总字节数在创建时确定"""
+    if length > storage.MAX_UPLOAD_SIZE:
+        raise storage.UploadTooLarge(length)
+    return await run_in_threadpool(_create, album_id, filename, length, description)
+
+async def get_session(upload_id: str) -> Optional[UploadSession]:
+    return await run_in_threadpool(_load, upload_id)
+
+async def append_chunk(upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> Optional[UploadSession]:
+    """从 offset 处追加一个分块，返回更新后的会话；会话不存在时返回 None。
+
+    offset 必须等于已接收的字节数，否则抛出 OffsetMismatch；超过创建时声明的长度时抛出 UploadTooLarge；
+    其他请求持有会话的文件锁时抛出 SessionBusy。客户端中途断开时保留已写入的部分，下次从新的 offset 继续。
+    """
+    fd = await run_in_threadpool(_acquire, upload_id)
+    if fd is None:
+        return None
+    try:
+        # 持有锁之后再读取 offset，其他 worker 不会同时追加
+        session = await get_session(upload_id)
+        if session is None:
+            return None
+        if offset != session.offset:
+            raise OffsetMismatch(session.offset)
+
+        received = session.offset
+        try:
+            async for chunk in chunks:
+                if received + len(chunk) > session.length:
+                    raise storage.UploadTooLarge(received + len(chunk))
+                await run_in_threadpool(_write, fd, chunk)
+                received += len(chunk)
+        except ClientDisconnect:
+            logger.info("上传分块中断", extra={"upload_id": upload_id, "offset": received})
+        return await run_in_threadpool(_touch, session._replace(offset=received))
+    finally:
+        # 关闭文件描述符同时释放文件锁
+        await run_in_threadpool(os.close, fd)
+
+async def finish_session(db: AsyncSession, session: UploadSession):
+    """全部字节到达后计算哈希，放到内容寻址存储并创建图片记录，然后删除会话。
+
+    并发的请求已经完成同一个会话时返回 None；其他请求正在完成时抛出 SessionBusy。
+    """
+    fd = await run_in_threadpool(_acquire, session.id)
+    if fd is None:
+        return None
+    try:
+        session = await get_session(session.id)
+        if session is None or not session.complete:
+            return None
+        sha256 = await run_in_threadpool(_hash_file, _session_path(session.id, DATA_FILE))
+        staged_path = await run_in_threadpool(_stage_copy, session.id)
+        staged = storage.StoredFile(path=staged_path, size=session.length, sha256=sha256)
+        db_image = await storage.create_image_from_staged(db, staged, session.filename, session.album_id, session.description)
+        await delete_session(session.id)
+    finally:
+        await run_in_threadpool(os.close, fd)
+    return db_image
+
+async def delete_session(upload_id: str) -> bool:
+    return await run_in_threadpool(_remove, upload_id)
+
+def remove_expired_sessions() -> int:
+    """删除过期的会话目录，返回删除的数量"""
+    if not os.path.isdir(SESSION_DIR):
+        return 0
+    removed = 0
+    now = time.time()
+    for upload_id in os.listdir(SESSION_DIR):
+        try:
+            with open(_session_path(upload_id, INFO_FILE)) as f:
+                expires_at = json.load(f)["expires_at"]
+        except (FileNotFoundError, NotADirectoryError, ValueError, KeyError):
+            # 创建中途失败的会话按目录修改时间判断
+            try:
+                expires_at = os.path.getmtime(_session_path(upload_id)) + RESUMABLE_UPLOAD_EXPIRES
+            except FileNotFoundError:
+                continue
+        if expires_at < now:
+            shutil.rmtree(_session_path(upload_id), ignore_errors=True)
+            removed += 1
+    return removed
+
+async def run_cleanup():
+    """定期清理过期会话，由启动事件创建为后台任务"""
+    while True:
+        try:
+            removed = await run_in_threadpool(remove_expired_sessions)
+            if removed:
+                logger.info("已清理过期上传会话", extra={"removed": removed})
+        except Exception:
+            logger.exception("清理上传会话时出错")
+        await asyncio.sleep(RESUMABLE_CLEANUP_INTERVAL)
@@ -1,99 +1,128 @@
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form, Request, Response, Query
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from . import crud, models, schemas
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, models, schemas, image_processing, http_cache, storage, object_storage, resumable
+from .cache import catalog_cache
 from .database import get_db
-from .models import LabelEnum
-import os
-import shutil
-from datetime import datetime
-from fastapi.responses import FileResponse
+from .log import get_logger
+from .serialization import DefaultResponse, json_response
+from .file_response import RangeFileResponse
+from .models import LabelEnum, ImageSize
+from .pagination import Cursor, RankCursor, cursor_param, rank_cursor_param, set_cursor_headers, set_rank_cursor_header
+import mimetypes
+from email.utils import formatdate
+from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
 
-router = APIRouter()
+logger = get_logger(__name__)
+
+router = APIRouter(default_response_class=DefaultResponse)
 
 # 文件夹相关路由
 @router.get("/folders", response_model=List[schemas.Folder])
-async def get_folders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    folders = crud.get_folders(db, skip=skip, limit=limit)
+async def get_folders(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    folders = await crud.get_folders(db, skip=skip, limit=limit)
     return folders
 
 @router.post("/folders", response_model=schemas.Folder)
-async def create_folder(folder: schemas.FolderCreate, db: Session = Depends(get_db)):
-    return crud.create_folder(db=db, folder=folder)
+async def create_folder(folder: schemas.FolderCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_folder(db=db, folder=folder)
 
 @router.get("/folders/{folder_id}", response_model=schemas.Folder)
-async def get_folder(folder_id: int, db: Session = Depends(get_db)):
-    db_folder = crud.get_folder(db, folder_id=folder_id)
+async def get_folder(folder_id: int, db: AsyncSession = Depends(get_db)):
+    db_folder = await crud.get_folder(db, folder_id=folder_id)
     if db_folder is None:
         raise HTTPException(status_code=404, detail="文件夹不存在")
     return db_folder
 
 @router.put("/folders/{folder_id}", response_model=schemas.Folder)
-async def update_folder(folder_id: int, folder: schemas.FolderCreate, db: Session = Depends(get_db)):
-    db_folder = crud.update_folder(db, folder_id=folder_id, folder=folder)
+async def update_folder(folder_id: int, folder: schemas.FolderCreate, db: AsyncSession = Depends(get_db)):
+    db_folder = await crud.update_folder(db, folder_id=folder_id, folder=folder)
     if db_folder is None:
         raise HTTPException(status_code=404, detail="文件夹不存在")
     return db_folder
 
 @router.delete("/folders/{folder_id}", response_model=bool)
-async def delete_folder(folder_id: int, db: Session = Depends(get_db)):
-    result = crud.delete_folder(db, folder_id=folder_id)
+async def delete_folder(folder_id: int, db: AsyncSession = Depends(get_db)):
+    result = await crud.delete_folder(db, folder_id=folder_id)
     if not result:
         raise HTTPException(status_code=404, detail="文件夹不存在")
     return True
 
 # 相册相关路由
 @router.get("/albums", response_model=List[schemas.Album])
-async def get_albums(skip: int = 0, limit: int = 100, label: Optional[LabelEnum] = None, db: Session = Depends(get_db)):
-    albums = crud.get_albums(db, skip=skip, limit=limit, label=label)
-    return albums
+async def get_albums(request: Request, response: Response, skip: int = 0, limit: int = 100, label: Optional[LabelEnum] = None, cursor: Optional[Cursor] = Depends(cursor_param), db: AsyncSession = Depends(get_db)):
+    # 版本号在查询之前读取，查询期间的写入会使下一次请求的 ETag 不同
+    version = await catalog_cache.version("albums")
+    albums = await crud.get_albums(db, skip=skip, limit=limit, label=label, cursor=cursor)
+    set_cursor_headers(response, albums, cursor, skip, limit)
+    not_modified = http_cache.conditional(request, response, *http_cache.rows_validators(*albums, version=version), route="albums")
+    if not_modified:
+        return not_modified
+    return json_response(List[schemas.Album], albums, response)
+
+@router.get("/gallery", response_model=List[schemas.GalleryAlbum])
+async def get_gallery(skip: int = 0, limit: int = 100, label: Optional[LabelEnum] = None, images_per_album: int = Query(4, ge=0, le=50), db: AsyncSession = Depends(get_db)):
+    gallery = await crud.get_gallery(db, skip=skip, limit=limit, label=label, images_per_album=images_per_album)
+    return json_response(List[schemas.GalleryAlbum], gallery)
 
 @router.get("/folders/{folder_id}/albums", response_model=List[schemas.Album])
-async def get_folder_albums(folder_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_albums_by_folder(db, folder_id=folder_id, skip=skip, limit=limit)
+async def get_folder_albums(folder_id: int, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    return await crud.get_albums_by_folder(db, folder_id=folder_id, skip=skip, limit=limit)
 
 @router.post("/albums", response_model=schemas.Album)
-async def create_album(album: schemas.AlbumCreate, db: Session = Depends(get_db)):
-    return crud.create_album(db=db, album=album)
+async def create_album(album: schemas.AlbumCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_album(db=db, album=album)
 
 @router.get("/albums/{album_id}", response_model=schemas.AlbumWithImages)
-async def get_album(album_id: int, db: Session = Depends(get_db)):
-    db_album = crud.get_album(db, album_id=album_id)
+async def get_album(album_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    version = await catalog_cache.version("albums")
+    db_album = await crud.get_album_with_images(db, album_id=album_id)
     if db_album is None:
         raise HTTPException(status_code=404, detail="相册不存在")
-    return db_album
+    not_modified = http_cache.conditional(request, response, *http_cache.rows_validators(db_album, *db_album.images, version=version), route="albums")
+    if not_modified:
+        return not_modified
+    return json_response(schemas.AlbumWithImages, db_album, response)
 
 @router.put("/albums/{album_id}", response_model=schemas.Album)
-async def update_album(album_id: int, album: schemas.AlbumUpdate, db: Session = Depends(get_db)):
-    db_album = crud.update_album(db, album_id=album_id, album=album)
+async def update_album(album_id: int, album: schemas.AlbumUpdate, db: AsyncSession = Depends(get_db)):
+    db_album = await crud.update_album(db, album_id=album_id, album=album)
     if db_album is None:
         raise HTTPException(status_code=404, detail="相册不存在")
     return db_album
 
 @router.delete("/albums/{album_id}", response_model=bool)
-async def delete_album(album_id: int, db: Session = Depends(get_db)):
-    result = crud.delete_album(db, album_id=album_id)
+async def delete_album(album_id: int, db: AsyncSession = Depends(get_db)):
+    result = await crud.delete_album(db, album_id=album_id)
     if not result:
         raise HTTPException(status_code=404, detail="相册不存在")
     return True
 
 # 图片相关路由
 @router.get("/images", response_model=List[schemas.Image])
-async def get_images(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    images = crud.get_images(db, skip=skip, limit=limit)
-    return images
+async def get_images(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = Depends(cursor_param), db: AsyncSession = Depends(get_db)):
+    images = await crud.get_images(db, skip=skip, limit=limit, cursor=cursor)
+    set_cursor_headers(response, images, cursor, skip, limit)
+    return json_response(List[schemas.Image], images, response)
 
 @router.get("/albums/{album_id}/images", response_model=List[schemas.Image])
-async def get_album_images(album_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_images_by_album(db, album_id=album_id, skip=skip, limit=limit)
+async def get_album_images(album_id: int, request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = Depends(cursor_param), db: AsyncSession = Depends(get_db)):
+    version = await catalog_cache.version("albums")
+    images = await crud.get_images_by_album(db, album_id=album_id, skip=skip, limit=limit, cursor=cursor)
+    set_cursor_headers(response, images, cursor, skip, limit)
+    not_modified = http_cache.conditional(request, response, *http_cache.rows_validators(*images, version=version), route="albums")
+    if not_modified:
+        return not_modified
+    return json_response(List[schemas.Image], images, response)
 
 @router.post("/images", response_model=schemas.Image)
-async def create_image(image: schemas.ImageCreate, db: Session = Depends(get_db)):
-    return crud.create_image(db=db, image=image)
+async def create_image(image: schemas.ImageCreate, db: AsyncSession = Depends(get_db)):
+    return await crud.create_image(db=db, image=image)
 
 @router.put("/images/{image_id}", response_model=schemas.Image)
-async def update_image(image_id: int, image: schemas.ImageUpdate, db: Session = Depends(get_db)):
-    db_image = crud.update_image(db, image_id=image_id, image=image)
+async def update_image(image_id: int, image: schemas.ImageUpdate, db: AsyncSession = Depends(get_db)):
+    db_image = await crud.update_image(db, image_id=image_id, image=image)
     if db_image is None:
         raise HTTPException(status_code=404, detail="图片不存在")
     return db_image
@@ -104,134 +133,279 @@ async def upload_image(
     album_id: int = Form(...),
     description: Optional[str] = Form(None),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # 确保相册存在
-    album = crud.get_album(db, album_id=album_id)
+    album = await crud.get_album(db, album_id=album_id)
     if not album:
         raise HTTPException(status_code=404, detail="相册不存在")
     
-    # 确保上传目录存在
-    upload_dir = os.path.join("uploads", str(album_id))
-    os.makedirs(upload_dir, exist_ok=True)
+    # 分块保存到内容寻址存储，不阻塞事件循环
+    try:
+        return await storage.create_image_from_upload(db, file, album_id=album_id, description=description)
+    except storage.UploadTooLarge:
+        raise HTTPException(status_code=413, detail="文件过大")
+
+@router.post("/upload/batch", response_model=List[schemas.UploadResult])
+async def upload_images(
+    album_id: int = Form(...),
+    description: Optional[str] = Form(None),
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    if len(files) > storage.UPLOAD_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"单次最多上传 {storage.UPLOAD_BATCH_MAX_FILES} 个文件")
     
-    # 生成文件名和路径
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    file_extension = os.path.splitext(file.filename)[1]
-    object_name = f"{timestamp}{file_extension}"
-    file_path = os.path.join(upload_dir, object_name)
+    # 确保相册存在（整批只查询一次）
+    album = await crud.get_album(db, album_id=album_id)
+    if not album:
+        raise HTTPException(status_code=404, detail="相册不存在")
     
-    # 保存文件
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # 并发写入文件，一个事务插入全部图片记录，返回每个文件的结果
+    return await storage.create_images_from_uploads(db, files, album_id=album_id, description=description)
+
+# 断点续传：创建会话后用 PATCH 按偏移量上传分块，HEAD/GET 查询进度
+def set_upload_headers(response: Response, session: resumable.UploadSession):
+    response.headers["Upload-Offset"] = str(session.offset)
+    response.headers["Upload-Length"] = str(session.length)
+    response.headers["Upload-Expires"] = formatdate(session.expires_at, usegmt=True)
+    response.headers["Cache-Control"] = "no-store"
+
+@router.post("/upload/sessions", response_model=schemas.UploadSession, status_code=201)
+async def create_upload_session(upload: schemas.UploadSessionCreate, response: Response, db: AsyncSession = Depends(get_db)):
+    if upload.length <= 0:
+        raise HTTPException(status_code=400, detail="文件大小无效")
+    album = await crud.get_album(db, album_id=upload.album_id)
+    if not album:
+        raise HTTPException(status_code=404, detail="相册不存在")
+    try:
+        session = await resumable.create_session(upload.album_id, upload.filename, upload.length, upload.description)
+    except storage.UploadTooLarge:
+        raise HTTPException(status_code=413, detail="文件过大")
+    response.headers["Location"] = f"/api/upload/sessions/{session.id}"
+    set_upload_headers(response, session)
+    return session
+
+@router.api_route("/upload/sessions/{upload_id}", methods=["GET", "HEAD"], response_model=schemas.UploadSession)
+async def get_upload_session(upload_id: str, response: Response):
+    session = await resumable.get_session(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="上传会话不存在或已过期")
+    set_upload_headers(response, session)
+    return session
+
+@router.patch("/upload/sessions/{upload_id}", response_model=schemas.UploadSession)
+async def upload_chunk(upload_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    try:
+        offset = int(request.headers["Upload-Offset"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="缺少 Upload-Offset")
     
-    # 创建图片记录
-    image_data = schemas.ImageCreate(
-        image_name=file.filename,
-        object_name=file_path,
-        album_id=album_id,
-        description=description
-    )
+    # 请求体直接流式写入会话文件，不在内存中缓存整个分块
+    try:
+        session = await resumable.append_chunk(upload_id, offset, request.stream())
+    except resumable.OffsetMismatch as e:
+        # 客户端用返回的 Upload-Offset 从正确的位置继续
+        raise HTTPException(status_code=409, detail="Upload-Offset 不一致", headers={"Upload-Offset": str(e.offset)})
+    except storage.UploadTooLarge:
+        raise HTTPException(status_code=413, detail="超过文件大小")
+    except resumable.SessionBusy:
+        raise HTTPException(status_code=423, detail="该会话正在上传")
+    if session is None:
+        raise HTTPException(status_code=404, detail="上传会话不存在或已过期")
+    set_upload_headers(response, session)
+    if not session.complete:
+        return session
     
-    return crud.create_image(db=db, image=image_data)
+    # 全部字节到达后才创建图片记录
+    album = await crud.get_album(db, album_id=session.album_id)
+    if not album:
+        await resumable.delete_session(upload_id)
+        raise HTTPException(status_code=404, detail="相册不存在")
+    try:
+        db_image = await resumable.finish_session(db, session)
+    except resumable.SessionBusy:
+        raise HTTPException(status_code=423, detail="该会话正在上传")
+    if db_image is None:
+        raise HTTPException(status_code=404, detail="上传会话不存在或已过期")
+    return {**session._asdict(), "image": db_image}
+
+@router.delete("/upload/sessions/{upload_id}", response_model=bool)
+async def delete_upload_session(upload_id: str):
+    if not await resumable.delete_session(upload_id):
+        raise HTTPException(status_code=404, detail="上传会话不存在或已过期")
+    return True
 
 @router.get("/images/{image_id}", response_model=schemas.Image)
-async def get_image(image_id: int, db: Session = Depends(get_db)):
-    db_image = crud.get_image(db, image_id=image_id)
+async def get_image(image_id: int, db: AsyncSession = Depends(get_db)):
+    db_image = await crud.get_image(db, image_id=image_id)
     if db_image is None:
         raise HTTPException(status_code=404, detail="图片不存在")
     return db_image
 
-@router.get("/images/{image_id}/file")
-async def get_image_file(image_id: int, db: Session = Depends(get_db)):
-    db_image = crud.get_image(db, image_id=image_id)
+# HEAD 供断点续传客户端获取文件大小
+@router.api_route("/images/{image_id}/file", methods=["GET", "HEAD"])
+async def get_image_file(image_id: int, request: Request, size: Optional[ImageSize] = None, db: AsyncSession = Depends(get_db)):
+    db_image = await crud.get_image(db, image_id=image_id)
     if db_image is None:
         raise HTTPException(status_code=404, detail="图片不存在")
     
-    if not os.path.exists(db_image.object_name):
+    file_path = await run_in_threadpool(image_processing.get_variant_path, db_image, size)
+    if not await run_in_threadpool(object_storage.backend.exists, file_path):
         raise HTTPException(status_code=404, detail="图片文件不存在")
     
-    return FileResponse(db_image.object_name)
+    # 根据 Accept 请求头返回 AVIF/WebP
+    image_format = image_processing.negotiate_format(request.headers.get("accept", ""))
+    if image_format:
+        file_path = await image_processing.get_transcoded_path(file_path, image_format)
+    pending = size is not None and not db_image.derivatives
+    
+    # 跳转到预签名 URL，文件内容由对象存储直接返回
+    if object_storage.IMAGE_SERVE_MODE == "redirect":
+        url = await run_in_threadpool(object_storage.backend.presigned_url, file_path)
+        if url:
+            cache_control = http_cache.CACHE_CONTROL["images_pending"] if pending else object_storage.REDIRECT_CACHE_CONTROL
+            return RedirectResponse(url, status_code=302, headers={"Cache-Control": cache_control, "Vary": "Accept"})
+    
+    try:
+        file_path = await run_in_threadpool(object_storage.backend.fetch, file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="图片文件不存在")
+    
+    # 文件内容哈希作为 ETag，未变化时返回 304
+    etag = await http_cache.file_etag(file_path)
+    last_modified = http_cache.file_last_modified(file_path)
+    headers = http_cache.validator_headers(etag, last_modified, route="images_pending" if pending else "images")
+    headers["Vary"] = "Accept"
+    if http_cache.is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    # 由 nginx 读取文件返回，Python 进程不再传输文件内容
+    if object_storage.IMAGE_SERVE_MODE == "accel":
+        headers["X-Accel-Redirect"] = object_storage.accel_redirect_path(file_path)
+        return Response(headers=headers, media_type=mimetypes.guess_type(file_path)[0])
+    
+    # 支持 Range 断点续传
+    return RangeFileResponse(file_path, headers=headers, method=request.method)
 
 @router.delete("/images/{image_id}", response_model=bool)
-async def delete_image(image_id: int, db: Session = Depends(get_db)):
-    result = crud.delete_image(db, image_id=image_id)
-    if not result:
+async def delete_image(image_id: int, db: AsyncSession = Depends(get_db)):
+    db_image = await crud.get_image(db, image_id=image_id)
+    if db_image is None:
         raise HTTPException(status_code=404, detail="图片不存在")
+    await crud.delete_image(db, image_id=image_id)
+    # 最后一个引用删除后才释放文件
+    await storage.release_image_files(db, db_image)
     return True
 
+# 搜索相关路由，按相关度排序
+@router.get("/search/albums", response_model=List[schemas.AlbumSearchResult])
+async def search_albums(response: Response, q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100), cursor: Optional[RankCursor] = Depends(rank_cursor_param), db: AsyncSession = Depends(get_db)):
+    albums = await crud.search_records(db, models.AlbumModel, q, limit=limit, cursor=cursor)
+    set_rank_cursor_header(response, albums, limit)
+    return json_response(List[schemas.AlbumSearchResult], albums, response)
+
+@router.get("/search/images", response_model=List[schemas.ImageSearchResult])
+async def search_images(response: Response, q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100), cursor: Optional[RankCursor] = Depends(rank_cursor_param), db: AsyncSession = Depends(get_db)):
+    images = await crud.search_records(db, models.ImageModel, q, limit=limit, cursor=cursor)
+    set_rank_cursor_header(response, images, limit)
+    return json_response(List[schemas.ImageSearchResult], images, response)
+
 # 服务相关路由
 @router.get("/services", response_model=List[schemas.Service])
-async def get_services(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    services = crud.get_services(db, skip=skip, limit=limit)
-    # 添加日志以便调试
-    print(f"从数据库获取服务列表: {services}")
-    return services
+async def get_services(request: Request, response: Response, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    version = await catalog_cache.version("services")
+    services = await crud.get_services(db, skip=skip, limit=limit)
+    logger.debug("获取服务列表", extra={"count": len(services), "skip": skip, "limit": limit})
+    not_modified = http_cache.conditional(request, response, *http_cache.rows_validators(*services, version=version), route="services")
+    if not_modified:
+        return not_modified
+    return json_response(List[schemas.Service], services, response)
 
 @router.get("/services/{service_id}", response_model=schemas.Service)
-async def get_service(service_id: int, db: Session = Depends(get_db)):
-    db_service = crud.get_service(db, service_id=service_id)
+async def get_service(service_id: int, db: AsyncSession = Depends(get_db)):
+    db_service = await crud.get_service(db, service_id=service_id)
     if db_service is None:
         raise HTTPException(status_code=404, detail="服务不存在")
     return db_service
 
 @router.post("/services", response_model=schemas.Service)
-async def create_service(service: schemas.ServiceCreate, db: Session = Depends(get_db)):
-    # 添加日志以便调试
-    print(f"创建新服务: {service}")
-    new_service = crud.create_service(db=db, service=service)
-    print(f"创建的服务数据: {new_service}")
+async def create_service(service: schemas.ServiceCreate, db: AsyncSession = Depends(get_db)):
+    new_service = await crud.create_service(db=db, service=service)
+    logger.info("创建服务", extra={"service_id": new_service.id})
     return new_service
 
+@router.put("/services/order", response_model=List[schemas.Service])
+async def reorder_services(order: schemas.ServiceOrder, db: AsyncSession = Depends(get_db)):
+    # 一个请求提交完整顺序，一条 UPDATE 语句完成；空列表和重复 id 由 ServiceOrder 校验（422）
+    services = await crud.reorder_services(db, service_ids=order.ids)
+    if services is None:
+        raise HTTPException(status_code=400, detail="需要按顺序提交全部服务的 id")
+    return services
+
 @router.put("/services/{service_id}", response_model=schemas.Service)
-async def update_service(service_id: int, service: schemas.ServiceUpdate, db: Session = Depends(get_db)):
-    # 添加日志以便调试
-    print(f"更新服务 {service_id}: {service}")
-    db_service = crud.update_service(db, service_id=service_id, service=service)
+async def update_service(service_id: int, service: schemas.ServiceUpdate, db: AsyncSession = Depends(get_db)):
+    logger.info("更新服务", extra={"service_id": service_id, "fields": sorted(service.dict(exclude_unset=True))})
+    db_service = await crud.update_service(db, service_id=service_id, service=service)
     if db_service is None:
         raise HTTPException(status_code=404, detail="服务不存在")
     return db_service
 
 @router.delete("/services/{service_id}", response_model=bool)
-async def delete_service(service_id: int, db: Session = Depends(get_db)):
-    # 添加日志以便调试
-    print(f"删除服务 {service_id}")
-    result = crud.delete_service(db, service_id=service_id)
+async def delete_service(service_id: int, db: AsyncSession = Depends(get_db)):
+    logger.info("删除服务", extra={"service_id": service_id})
+    result = await crud.delete_service(db, service_id=service_id)
     if not result:
         raise HTTPException(status_code=404, detail="服务不存在")
     return True
 
+# 批量修改服务、相册和图片
+@router.patch("/batch", response_model=schemas.BatchUpdateResult)
+async def batch_update(batch: schemas.BatchUpdate, db: AsyncSession = Depends(get_db)):
+    counts = await crud.apply_batch_update(db, batch=batch)
+    if counts is None:
+        raise HTTPException(status_code=404, detail="部分记录不存在")
+    return counts
+
 # 联系表单相关路由
 @router.post("/contact", response_model=schemas.ContactResponse)
-async def create_contact(contact: schemas.ContactRequest, db: Session = Depends(get_db)):
-    return crud.create_contact(db=db, contact=contact)
+async def create_contact(contact: schemas.ContactRequest, db: AsyncSession = Depends(get_db)):
+    return await crud.create_contact(db=db, contact=contact)
 
 @router.get("/admin/contacts", response_model=List[schemas.ContactResponse])
-async def get_contacts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_contacts(db, skip=skip, limit=limit)
+async def get_contacts(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = Depends(cursor_param), db: AsyncSession = Depends(get_db)):
+    contacts = await crud.get_contacts(db, skip=skip, limit=limit, cursor=cursor)
+    set_cursor_headers(response, contacts, cursor, skip, limit)
+    return json_response(List[schemas.ContactResponse], contacts, response)
+
+@router.get("/admin/contacts/search", response_model=List[schemas.ContactSearchResult])
+async def search_contacts(response: Response, q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100), cursor: Optional[RankCursor] = Depends(rank_cursor_param), db: AsyncSession = Depends(get_db)):
+    contacts = await crud.search_records(db, models.ContactModel, q, limit=limit, cursor=cursor)
+    set_rank_cursor_header(response, contacts, limit)
+    return json_response(List[schemas.ContactSearchResult], contacts, response)
 
 @router.get("/admin/contacts/{contact_id}", response_model=schemas.ContactResponse)
-async def get_contact(contact_id: int, db: Session = Depends(get_db)):
-    db_contact = crud.get_contact(db, contact_id=contact_id)
+async def get_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+    db_contact = await crud.get_contact(db, contact_id=contact_id)
     if db_contact is None:
         raise HTTPException(status_code=404, detail="联系消息不存在")
     return db_contact
 
 @router.put("/admin/contacts/{contact_id}", response_model=schemas.ContactResponse)
-async def update_contact_status(contact_id: int, status: schemas.ContactUpdate, db: Session = Depends(get_db)):
-    db_contact = crud.update_contact_status(db, contact_id=contact_id, is_read=status.is_read)
+async def update_contact_status(contact_id: int, status: schemas.ContactUpdate, db: AsyncSession = Depends(get_db)):
+    db_contact = await crud.update_contact_status(db, contact_id=contact_id, is_read=status.is_read)
     if db_contact is None:
         raise HTTPException(status_code=404, detail="联系消息不存在")
     return db_contact
 
 @router.delete("/admin/contacts/{contact_id}", response_model=bool)
-async def delete_contact(contact_id: int, db: Session = Depends(get_db)):
-    result = crud.delete_contact(db, contact_id=contact_id)
+async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+    result = await crud.delete_contact(db, contact_id=contact_id)
     if not result:
         raise HTTPException(status_code=404, detail="联系消息不存在")
     return True
 
 # 统计数据路由
 @router.get("/admin/statistics", response_model=schemas.Statistics)
-async def get_statistics(db: Session = Depends(get_db)):
-    return crud.get_statistics(db) 
\ No newline at end of file
+async def get_statistics(db: AsyncSession = Depends(get_db)):
+    return await crud.get_statistics(db) 
\ No newline at end of file
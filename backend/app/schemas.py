@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+from typing import Dict, List, Optional
 from datetime import datetime
 from .models import LabelEnum
 
@@ -15,8 +15,7 @@ class Folder(FolderBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # 相册相关模型
 class AlbumBase(BaseModel):
@@ -39,8 +38,7 @@ class Album(AlbumBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # 图片相关模型
 class ImageBase(BaseModel):
@@ -57,20 +55,67 @@ class ImageUpdate(BaseModel):
     description: Optional[str] = None
     album_id: Optional[int] = None
 
-class Image(ImageBase):
+# 上传时读取的图片信息，占位图在后台生成
+class ImageMetadata(BaseModel):
+    width: Optional[int] = None
+    height: Optional[int] = None
+    file_size: Optional[int] = None
+    mime_type: Optional[str] = None
+    placeholder: Optional[str] = None
+
+class Image(ImageMetadata, ImageBase):
     id: int
+    derivatives: Optional[Dict[str, str]] = None
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+# 批量上传中单个文件的结果
+class UploadResult(BaseModel):
+    filename: str
+    image: Optional[Image] = None
+    error: Optional[str] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+# 断点续传会话
+class UploadSessionCreate(BaseModel):
+    album_id: int
+    filename: str
+    length: int  # 文件总字节数
+    description: Optional[str] = None
+
+class UploadSession(UploadSessionCreate):
+    id: str
+    offset: int  # 已接收的字节数
+    expires_at: datetime
+    image: Optional[Image] = None  # 全部字节到达后创建的图片
+    
+    model_config = ConfigDict(from_attributes=True)
 
 # 相册带图片的模型
 class AlbumWithImages(Album):
     images: List[Image] = []
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+# 画廊列表中的图片摘要
+class ImageSummary(ImageMetadata):
+    id: int
+    image_name: str
+    object_name: str
+    derivatives: Optional[Dict[str, str]] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+# 画廊相册：封面、前几张图片和图片总数
+class GalleryAlbum(Album):
+    cover: Optional[ImageSummary] = None
+    images: List[ImageSummary] = []
+    image_count: int = 0
 
 # 案例相关模型
 class CaseBase(BaseModel):
@@ -85,8 +130,7 @@ class CaseCreate(CaseBase):
 class Case(CaseBase):
     id: int
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # 服务相关模型
 class ServiceBase(BaseModel):
@@ -109,8 +153,38 @@ class Service(ServiceBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+# 服务排序：按 ids 的顺序设置 order
+class ServiceOrder(BaseModel):
+    ids: List[int] = Field(min_length=1)
+
+    @field_validator("ids")
+    @classmethod
+    def unique_ids(cls, ids: List[int]) -> List[int]:
+        if len(set(ids)) != len(ids):
+            raise ValueError("服务 id 重复")
+        return ids
+
+# 批量修改，每项包含主键和要修改的字段
+class ServiceBatchUpdate(ServiceUpdate):
+    id: int
+
+class AlbumBatchUpdate(AlbumUpdate):
+    id: int
+
+class ImageBatchUpdate(ImageUpdate):
+    id: int
+
+class BatchUpdate(BaseModel):
+    services: List[ServiceBatchUpdate] = []
+    albums: List[AlbumBatchUpdate] = []
+    images: List[ImageBatchUpdate] = []
+
+class BatchUpdateResult(BaseModel):
+    services: int
+    albums: int
+    images: int
 
 # 联系表单相关模型
 class ContactRequest(BaseModel):
@@ -127,8 +201,17 @@ class ContactResponse(ContactRequest):
     is_read: int
     created_at: datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+# 搜索结果，rank 越大越相关
+class AlbumSearchResult(Album):
+    rank: float
+
+class ImageSearchResult(Image):
+    rank: float
+
+class ContactSearchResult(ContactResponse):
+    rank: float
 
 # 统计数据模型
 class Statistics(BaseModel):
@@ -136,4 +219,37 @@ class Statistics(BaseModel):
     image_count: int
     service_count: int
     contact_count: int
-    unread_contact_count: int 
\ No newline at end of file
+    unread_contact_count: int 
+
+# 连接池状态模型
+class PoolStats(BaseModel):
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout: Optional[float] = None
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None
+    wait_time_total_ms: Optional[float] = None
+    wait_time_avg_ms: Optional[float] = None
+    wait_time_max_ms: Optional[float] = None
+
+class PoolStatus(BaseModel):
+    db_mode: str
+    async_pool: PoolStats
+    sync_pool: PoolStats
+
+
+# 读缓存统计模型
+class CacheCounters(BaseModel):
+    hits: int
+    misses: int
+    invalidations: int
+
+class CacheStats(BaseModel):
+    backend: str
+    entries: Optional[int] = None
+    ttl: float
+    namespaces: Dict[str, CacheCounters]
@@ -0,0 +1,52 @@
+from typing import Optional
+from sqlalchemy import and_, func, literal, literal_column, or_, select, table, column
+from . import models
+from .database import engine
+from .pagination import RankCursor
+
+# SQLite trigram 分词至少需要 3 个字符，更短的关键词退回 LIKE 扫描
+FTS_MIN_LENGTH = 3
+
+def _postgresql_ranked(model, q: str):
+    """tsvector 匹配整词，三元组索引匹配子串（中文），排名取两者较大值"""
+    document = models.search_document(model)
+    vector = models.search_vector(model)
+    query = func.plainto_tsquery(literal("simple", literal_execute=True), q)
+    rank = func.greatest(func.ts_rank(vector, query), func.word_similarity(q, document))
+    return select(model.id.label("id"), rank.label("rank")).filter(
+        or_(vector.op("@@")(query), document.icontains(q, autoescape=True))
+    )
+
+def _sqlite_ranked(model, q: str):
+    """FTS5 外部内容表，bm25 越小越相关，取负数后与 PostgreSQL 一样按 rank 倒序"""
+    if len(q) < FTS_MIN_LENGTH:
+        document = models.search_document(model)
+        return select(model.id.label("id"), literal(0.0).label("rank")).filter(document.contains(q, autoescape=True))
+    name = f"{model.__tablename__}_fts"
+    fts = table(name, column("rowid"))
+    # 整个关键词作为短语匹配，避免用户输入被解析为 FTS5 查询语法
+    phrase = '"' + q.replace('"', '""') + '"'
+    return (
+        select(model.id.label("id"), (-func.bm25(literal_column(name))).label("rank"))
+        .join(fts, fts.c.rowid == model.id)
+        .filter(literal_column(name).op("MATCH")(phrase))
+    )
+
+def build_search_query(model, q: str, limit: int, cursor: Optional[RankCursor] = None):
+    """按相关度倒序的搜索查询，返回 (记录, rank)；游标为上一页最后一条的 (rank, id)"""
+    if engine.dialect.name == "postgresql":
+        ranked = _postgresql_ranked(model, q).subquery()
+    elif engine.dialect.name == "sqlite":
+        ranked = _sqlite_ranked(model, q).subquery()
+    else:
+        # 其他数据库没有全文索引，退回 LIKE 扫描
+        document = models.search_document(model)
+        ranked = select(model.id.label("id"), literal(0.0).label("rank")).filter(document.contains(q, autoescape=True)).subquery()
+
+    query = select(model, ranked.c.rank).join(ranked, ranked.c.id == model.id)
+    if cursor is not None:
+        query = query.filter(or_(
+            ranked.c.rank < cursor.rank,
+            and_(ranked.c.rank == cursor.rank, ranked.c.id < cursor.id),
+        ))
+    return query.order_by(ranked.c.rank.desc(), ranked.c.id.desc()).limit(limit)
@@ -0,0 +1,35 @@
+import functools
+from typing import Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+# orjson 可选：未安装时默认响应类退回标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+else:
+    DefaultResponse = JSONResponse
+
+@functools.lru_cache(maxsize=None)
+def get_adapter(response_type) -> TypeAdapter:
+    """每种响应类型只构建一次 TypeAdapter（构建校验器和序列化器的开销较大）"""
+    return TypeAdapter(response_type)
+
+def json_response(response_type, content, response: Optional[Response] = None) -> Response:
+    """按 response_type 从 ORM 对象读取属性，由 pydantic-core 直接序列化为 JSON 字节。
+
+    跳过 FastAPI 通用路径中的 jsonable 中间结构和再次 json.dumps；
+    路由中设置在 response 上的响应头（ETag、游标等）会带到返回的响应中。
+    """
+    adapter = get_adapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    if response is None:
+        return Response(body, media_type="application/json")
+    fast_response = Response(body, status_code=response.status_code or 200, media_type="application/json")
+    fast_response.raw_headers.extend(response.raw_headers)
+    return fast_response
@@ -0,0 +1,220 @@
+import os
+import uuid
+import asyncio
+import hashlib
+import contextlib
+from typing import List, NamedTuple, Optional
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from . import crud, schemas, image_processing, object_storage
+from .log import get_logger
+
+# fcntl 只在 POSIX 上可用；没有时 blob 锁只在单个进程内生效
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# 上传配置
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(50 * 1024 * 1024)))  # 单个文件字节数上限
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 批量上传时同时写入的文件数
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "8"))
+UPLOAD_BATCH_MAX_FILES = int(os.getenv("UPLOAD_BATCH_MAX_FILES", "200"))
+
+# 按内容哈希寻址的文件目录，相同内容只存一份
+BLOB_DIR = os.path.join("uploads", "blobs")
+STAGING_DIR = os.path.join(BLOB_DIR, "tmp")
+# blob 锁文件按路径哈希分成 256 组，数量固定，不需要清理
+LOCK_DIR = os.path.join(BLOB_DIR, "locks")
+LOCK_POLL_INTERVAL = 0.01
+
+class UploadTooLarge(Exception):
+    """上传文件超过 MAX_UPLOAD_SIZE"""
+
+class StoredFile(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+class UploadResult(NamedTuple):
+    """批量上传中单个文件的结果，image 与 error 二选一"""
+    filename: str
+    image: Optional[object] = None
+    error: Optional[str] = None
+
+def _write_chunk(buffer, digest, chunk: bytes):
+    buffer.write(chunk)
+    digest.update(chunk)
+
+def _discard(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+async def stage_upload(file: UploadFile, directory: str = STAGING_DIR, max_size: int = MAX_UPLOAD_SIZE) -> StoredFile:
+    """分块写入临时文件，写盘和哈希在线程池中进行，边写边计算大小和 SHA-256。
+
+    失败或超过大小限制时删除临时文件。临时文件与目标目录在同一文件系统，之后可以原子替换。
+    """
+    # 大小已知时在写盘前直接拒绝
+    if file.size is not None and file.size > max_size:
+        raise UploadTooLarge(file.size)
+
+    await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await run_in_threadpool(open, temp_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLarge(size)
+            await run_in_threadpool(_write_chunk, buffer, digest, chunk)
+        await run_in_threadpool(buffer.close)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_discard, temp_path)
+        raise
+    return StoredFile(path=temp_path, size=size, sha256=digest.hexdigest())
+
+def _lock_path(path: str) -> str:
+    return os.path.join(LOCK_DIR, f"{hashlib.sha256(path.encode()).hexdigest()[:2]}.lock")
+
+def _try_lock(fd: int) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+@contextlib.asynccontextmanager
+async def blob_lock(*paths: str):
+    """按 blob 路径加跨进程的排他锁，串行化“写入记录并放置 blob”和“统计引用并删除 blob”。
+
+    多个路径按锁文件排序后依次获取，避免死锁。不在线程中阻塞等待：
+    请求被取消时 finally 会关闭已打开的锁文件，不会留下无人释放的锁。
+    """
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    fds = []
+    try:
+        for lock_path in sorted({_lock_path(path) for path in paths}):
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fds.append(fd)
+            while not _try_lock(fd):
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+        yield
+    finally:
+        # 关闭文件描述符同时释放文件锁
+        for fd in fds:
+            os.close(fd)
+
+def blob_path(sha256: str, extension: str = "") -> str:
+    """例如 uploads/blobs/3f/3f2a...9c.jpg，保留扩展名以便按类型返回"""
+    return os.path.join(BLOB_DIR, sha256[:2], f"{sha256}{extension.lower()}")
+
+def _commit_blob(temp_path: str, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 内容相同，直接覆盖已有 blob 也不会改变文件
+    os.replace(temp_path, path)
+    object_storage.backend.put(path)
+
+async def read_metadata(stored: StoredFile) -> schemas.ImageMetadata:
+    """上传时读取宽高和 MIME 类型（只解析文件头），占位图由后台任务生成"""
+    try:
+        info = await run_in_threadpool(image_processing.read_image_info, stored.path)
+    except Exception:
+        # 不是 Pillow 能识别的图片时只记录大小
+        info = {}
+    return schemas.ImageMetadata(file_size=stored.size, **info)
+
+async def create_image_from_upload(db: AsyncSession, file: UploadFile, album_id: int, description: Optional[str] = None):
+    """保存上传文件到内容寻址存储并创建图片记录，重复内容共享同一个 blob"""
+    staged = await stage_upload(file)
+    return await create_image_from_staged(db, staged, file.filename, album_id, description)
+
+async def create_image_from_staged(db: AsyncSession, staged: StoredFile, filename: Optional[str], album_id: int, description: Optional[str] = None):
+    """把已写完的临时文件放到 blob 路径并创建图片记录，失败时删除临时文件。
+
+    写入记录和放置 blob 在 blob_lock 内进行，与 release_image_files 的统计引用和删除文件互斥：
+    删除方要么在这之前删除旧文件（随后由这里重新写入），要么在这之后统计到这条新记录。
+    """
+    path = blob_path(staged.sha256, os.path.splitext(filename or "")[1])
+    image_data = schemas.ImageCreate(
+        image_name=filename,
+        object_name=path,
+        album_id=album_id,
+        description=description
+    )
+    try:
+        metadata = await read_metadata(staged)
+        async with blob_lock(path):
+            db_image = await crud.create_image(db=db, image=image_data, metadata=metadata)
+            await run_in_threadpool(_commit_blob, staged.path, path)
+    except BaseException:
+        await run_in_threadpool(_discard, staged.path)
+        raise
+    # 后台生成缩略图等衍生图，已存在的衍生图直接复用
+    image_processing.schedule_derivatives(db_image.id, path)
+    return db_image
+
+async def create_images_from_uploads(db: AsyncSession, files: List[UploadFile], album_id: int, description: Optional[str] = None) -> List[UploadResult]:
+    """批量上传：并发写入临时文件，在一个事务中插入全部图片记录，返回每个文件的结果。
+
+    单个文件过大或写入失败只影响该文件；数据库写入失败时删除全部临时文件并抛出异常。
+    """
+    semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+    async def stage(file: UploadFile):
+        async with semaphore:
+            return await stage_upload(file)
+
+    staged = await asyncio.gather(*(stage(file) for file in files), return_exceptions=True)
+    results = [None] * len(files)
+    accepted = []
+    for index, (file, stored) in enumerate(zip(files, staged)):
+        if isinstance(stored, UploadTooLarge):
+            results[index] = UploadResult(file.filename, error="文件过大")
+        elif isinstance(stored, Exception):
+            logger.error("保存上传文件时出错", exc_info=stored, extra={"upload_filename": file.filename})
+            results[index] = UploadResult(file.filename, error="保存文件失败")
+        elif isinstance(stored, BaseException):
+            raise stored
+        else:
+            accepted.append((index, file, stored, blob_path(stored.sha256, os.path.splitext(file.filename or "")[1])))
+
+    # 同一批中内容相同的文件只保留一份
+    blobs = {}
+    for _, _, stored, path in accepted:
+        blobs.setdefault(path, stored.path)
+    try:
+        metadata = await asyncio.gather(*(read_metadata(stored) for _, _, stored, _ in accepted))
+        # 与单个上传相同，写入记录和放置 blob 在 blob_lock 内进行
+        async with blob_lock(*blobs):
+            db_images = await crud.create_images(db, [
+                schemas.ImageCreate(image_name=file.filename, object_name=path, album_id=album_id, description=description)
+                for _, file, _, path in accepted
+            ], metadata=metadata)
+            await asyncio.gather(*(run_in_threadpool(_commit_blob, temp_path, path) for path, temp_path in blobs.items()))
+    finally:
+        # 已放到 blob 路径的临时文件不存在，_discard 直接跳过
+        await asyncio.gather(*(run_in_threadpool(_discard, stored.path) for _, _, stored, _ in accepted))
+
+    for (index, file, _, path), db_image in zip(accepted, db_images):
+        image_processing.schedule_derivatives(db_image.id, path)
+        results[index] = UploadResult(file.filename, image=db_image)
+    return results
+
+async def release_image_files(db: AsyncSession, db_image):
+    """图片记录删除后调用：没有其他记录引用同一个 blob 时才删除文件和衍生图。
+
+    统计和删除在 blob_lock 内进行，同一内容的并发上传不会在两者之间插入新记录。
+    """
+    async with blob_lock(db_image.object_name):
+        if await crud.count_image_references(db, db_image.object_name) == 0:
+            await run_in_threadpool(image_processing.remove_image_files, db_image)
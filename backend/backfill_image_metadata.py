@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+为已有图片补充宽高、文件大小、MIME 类型和占位图（images 中这些字段为空的记录）。
+多个线程并行读取 uploads/ 中的文件，相同文件只处理一次。
+
+用法：
+    python backfill_image_metadata.py --dry-run      # 只输出待处理的数量
+    python backfill_image_metadata.py --workers 8
+    python backfill_image_metadata.py --force        # 重新处理全部图片
+"""
+
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# 加载环境变量
+load_dotenv()
+
+# 设置工作目录，object_name 是相对于 backend 目录的路径
+script_dir = os.path.dirname(os.path.abspath(__file__))
+os.chdir(script_dir)
+sys.path.insert(0, script_dir)
+
+from sqlalchemy import or_, select, update
+
+from app import models, image_processing, object_storage
+from app.cache import catalog_cache
+from app.database import SessionLocal
+
+BATCH_SIZE = 500
+
+def analyze(path: str):
+    """返回 (路径, 图片信息或 None, 错误信息)"""
+    try:
+        local_path = object_storage.backend.fetch(path)
+        info = image_processing.read_image_info(local_path, with_placeholder=True)
+        info["file_size"] = os.path.getsize(local_path)
+        return path, info, None
+    except Exception as e:
+        return path, None, str(e)
+
+def main():
+    parser = argparse.ArgumentParser(description="补充图片元数据和占位图")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--force", action="store_true", help="重新处理已有元数据的图片")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = select(models.ImageModel.id, models.ImageModel.object_name)
+        if not args.force:
+            query = query.filter(or_(
+                models.ImageModel.width.is_(None),
+                models.ImageModel.file_size.is_(None),
+                models.ImageModel.placeholder.is_(None),
+            ))
+        # 相同内容的图片共享 blob，按文件分组
+        ids_by_path = {}
+        for image_id, object_name in db.execute(query):
+            ids_by_path.setdefault(object_name, []).append(image_id)
+        print(f"待处理图片 {sum(len(ids) for ids in ids_by_path.values())} 张，文件 {len(ids_by_path)} 个")
+        if args.dry_run:
+            return
+
+        # Pillow 解码和缩放时释放 GIL，线程池即可并行
+        updated, failed, rows = 0, 0, []
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for path, info, error in pool.map(analyze, ids_by_path):
+                if info is None:
+                    failed += 1
+                    print(f"跳过 {path}: {error}")
+                else:
+                    rows.extend({"id": image_id, **info} for image_id in ids_by_path[path])
+                if len(rows) >= BATCH_SIZE:
+                    db.execute(update(models.ImageModel), rows)
+                    db.commit()
+                    updated += len(rows)
+                    rows = []
+        if rows:
+            db.execute(update(models.ImageModel), rows)
+            db.commit()
+            updated += len(rows)
+        catalog_cache.invalidate_sync("albums")
+    finally:
+        db.close()
+
+    print(f"更新图片 {updated} 张，失败文件 {failed} 个")
+
+if __name__ == "__main__":
+    main()
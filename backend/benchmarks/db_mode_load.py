@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+数据库访问模式压测：分别以 DB_MODE=async 和 DB_MODE=sync 启动 uvicorn，
+并发请求公开接口，输出每种模式的每秒请求数。
+
+用法：
+    python benchmarks/db_mode_load.py --requests 2000 --concurrency 50
+    # 对已运行的服务（例如旧版本代码）压测
+    python benchmarks/db_mode_load.py --base-url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+# 设置工作目录
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(script_dir)
+
+DEFAULT_PATHS = ["/api/albums", "/api/services", "/api/images"]
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base_url}/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"服务未在 {timeout} 秒内启动: {base_url}")
+
+async def run_load(base_url: str, paths, total: int, concurrency: int):
+    """并发发送 total 个请求，返回 (每秒请求数, 失败数)"""
+    counter = iter(range(total))
+    errors = 0
+
+    async def worker(client):
+        nonlocal errors
+        for i in counter:
+            response = await client.get(paths[i % len(paths)])
+            if response.status_code >= 400:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return total / elapsed, errors
+
+def start_server(mode: str, port: int):
+    env = dict(os.environ, DB_MODE=mode)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description="async/sync 数据库模式压测")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--base-url", help="压测已运行的服务，不自动启动 uvicorn")
+    args = parser.parse_args()
+
+    if args.base_url:
+        rps, errors = await run_load(args.base_url, args.paths, args.requests, args.concurrency)
+        print(f"{args.base_url}: {rps:.1f} req/s, {errors} errors")
+        return
+
+    results = {}
+    for mode in args.modes:
+        server = start_server(mode, args.port)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            await wait_until_ready(base_url)
+            # 预热连接池
+            await run_load(base_url, args.paths, args.concurrency, args.concurrency)
+            results[mode] = await run_load(base_url, args.paths, args.requests, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'mode':<8}{'req/s':>12}{'errors':>10}")
+    for mode, (rps, errors) in results.items():
+        print(f"{mode:<8}{rps:>12.1f}{errors:>10}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+文件传输基准：在 uvicorn 中分别用 starlette FileResponse 和 RangeFileResponse 返回同一个文件，
+并发下载完整文件，输出每种方式的每秒请求数和吞吐量；另外测试 RangeFileResponse 返回 1 MB 区间（断点续传）的情况。
+
+用法：
+    python benchmarks/file_serving.py --size-mb 10 --concurrency 16 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# 添加项目根目录到系统路径
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from starlette.applications import Starlette
+from starlette.responses import FileResponse
+from starlette.routing import Route
+
+from app.file_response import RangeFileResponse
+
+# uvicorn 子进程通过环境变量得到测试文件路径
+BENCH_FILE = os.getenv("FILE_SERVING_BENCH_FILE", "")
+
+async def serve_baseline(request):
+    return FileResponse(BENCH_FILE, media_type="application/octet-stream")
+
+async def serve_range(request):
+    return RangeFileResponse(BENCH_FILE, media_type="application/octet-stream", method=request.method)
+
+app = Starlette(routes=[Route("/baseline", serve_baseline), Route("/range", serve_range)])
+
+async def run_load(base_url: str, path: str, concurrency: int, duration: float, headers=None):
+    """并发下载 duration 秒，返回 (每秒请求数, MB/s, 失败数)"""
+    requests, received, errors = 0, 0, 0
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal requests, received, errors
+            while time.perf_counter() < deadline:
+                async with client.stream("GET", path, headers=headers) as response:
+                    async for chunk in response.aiter_raw():
+                        received += len(chunk)
+                    if response.status_code >= 400:
+                        errors += 1
+                requests += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, received / elapsed / (1024 * 1024), errors
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.head(f"{base_url}/baseline")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"服务未在 {timeout} 秒内启动: {base_url}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="FileResponse 与 RangeFileResponse 传输对比")
+    parser.add_argument("--size-mb", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+        f.write(os.urandom(args.size_mb * 1024 * 1024))
+        bench_file = f.name
+    env = dict(os.environ, FILE_SERVING_BENCH_FILE=bench_file)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "file_serving:app", "--app-dir", os.path.join(backend_dir, "benchmarks"),
+         "--port", str(args.port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    cases = [
+        ("FileResponse", "/baseline", None),
+        ("RangeFileResponse", "/range", None),
+        ("RangeFileResponse 1MB range", "/range", {"Range": f"bytes={1024 * 1024}-{2 * 1024 * 1024 - 1}"}),
+    ]
+    results = {}
+    try:
+        await wait_until_ready(base_url)
+        for name, path, headers in cases:
+            await run_load(base_url, path, args.concurrency, 1.0, headers)  # 预热
+            results[name] = await run_load(base_url, path, args.concurrency, args.duration, headers)
+    finally:
+        server.terminate()
+        server.wait()
+        os.remove(bench_file)
+
+    print(f"{'case':<30}{'req/s':>10}{'MB/s':>10}{'errors':>8}")
+    for name, (rps, mbps, errors) in results.items():
+        print(f"{name:<30}{rps:>10.1f}{mbps:>10.1f}{errors:>8}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+负载基准：向单独的数据库写入指定数量的相册、图片、服务和客户留言，启动 uvicorn，
+由多个并发客户端按权重请求主要的公开接口和管理接口，
+把每个接口的 p50/p95/p99 延迟、吞吐量和每个请求的 SQL 语句数写入 JSON 文件。
+
+SQL 语句数来自响应头 Server-Timing（需要 METRICS_ENABLED，默认开启）。
+
+用法：
+    python benchmarks/load_suite.py --albums 500 --images 20000 --concurrency 50 --duration 30
+    # 与之前的结果比较
+    python benchmarks/load_suite.py --baseline benchmarks/results/load-20240501-120000.json
+    # 对已运行并已有数据的服务压测
+    python benchmarks/load_suite.py --base-url http://localhost:8000 --skip-seed
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+# 设置工作目录，与 uvicorn 启动目录相同（uploads/ 相对于 backend 目录）
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(script_dir)
+sys.path.insert(0, script_dir)
+
+DEFAULT_DATABASE_URL = "sqlite:///./benchmarks/load_bench.db"
+RESULTS_DIR = os.path.join("benchmarks", "results")
+SAMPLE_DIR = os.path.join("uploads", "bench")
+SAMPLE_IMAGES = 8
+BATCH_SIZE = 10000
+SEARCH_TERMS = ["相册", "客厅", "報價", "image_1"]
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries"')
+
+def seed(database_url: str, albums: int, images: int, services: int, contacts: int):
+    """重建表并批量写入测试数据，图片记录轮流指向几张真实的示例图片"""
+    os.environ["DATABASE_URL"] = database_url
+    from PIL import Image
+    from sqlalchemy import insert, select
+    from app import models
+    from app.database import Base, engine
+
+    os.makedirs(SAMPLE_DIR, exist_ok=True)
+    sample_paths = []
+    for i in range(SAMPLE_IMAGES):
+        path = os.path.join(SAMPLE_DIR, f"sample_{i}.jpg")
+        if not os.path.exists(path):
+            Image.new("RGB", (1600, 1200), (i * 30 % 256, 120, 200 - i * 20)).save(path, quality=85)
+        sample_paths.append(path)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    start = datetime.now() - timedelta(days=730)
+
+    def random_time():
+        return start + timedelta(seconds=random.randint(0, 730 * 86400))
+
+    with engine.begin() as conn:
+        def insert_batches(table, total, make_row):
+            for offset in range(0, total, BATCH_SIZE):
+                rows = [make_row(i) for i in range(offset, min(offset + BATCH_SIZE, total))]
+                conn.execute(insert(table), rows)
+                print(f"  {table.name}: {min(offset + BATCH_SIZE, total)}/{total}", end="\r")
+            print()
+
+        insert_batches(models.AlbumModel.__table__, albums, lambda i: {
+            "album_name": f"相册 {i}",
+            "label": random.choice(list(models.LabelEnum)),
+            "description": random.choice(["客厅翻新", "厨房改造", "办公室装修"]) + f" {i}",
+            "created_at": random_time(),
+            "updated_at": random_time(),
+        })
+        album_ids = conn.execute(select(models.AlbumModel.id)).scalars().all()
+        insert_batches(models.ImageModel.__table__, images, lambda i: {
+            "image_name": f"image_{i}.jpg",
+            "object_name": sample_paths[i % len(sample_paths)],
+            "album_id": random.choice(album_ids),
+            "created_at": random_time(),
+            "updated_at": random_time(),
+        })
+        insert_batches(models.ServiceModel.__table__, services, lambda i: {
+            "name": f"服务 {i}",
+            "description": "测试服务",
+            "order": i,
+            "created_at": random_time(),
+            "updated_at": random_time(),
+        })
+        insert_batches(models.ContactModel.__table__, contacts, lambda i: {
+            "name": f"客户 {i}",
+            "phone": "0912345678",
+            "email": f"customer{i}@example.com",
+            "message": "想了解室內裝修報價",
+            "is_read": 0 if random.random() < 0.05 else 1,
+            "created_at": random_time(),
+        })
+    engine.dispose()
+
+def build_scenarios(volumes: dict):
+    """(名称, 权重, 是否需要登录, 生成 (方法, 路径, JSON 请求体) 的函数)，名称使用路由模板"""
+    def pick(name):
+        return lambda rng: rng.randint(1, max(volumes[name], 1))
+
+    album, image, service = pick("albums"), pick("images"), pick("services")
+    return [
+        ("GET /api/albums", 10, False, lambda rng: ("GET", "/api/albums", None)),
+        ("GET /api/gallery", 10, False, lambda rng: ("GET", "/api/gallery", None)),
+        ("GET /api/albums/{album_id}", 15, False, lambda rng: ("GET", f"/api/albums/{album(rng)}", None)),
+        ("GET /api/albums/{album_id}/images", 10, False, lambda rng: ("GET", f"/api/albums/{album(rng)}/images", None)),
+        ("GET /api/images", 5, False, lambda rng: ("GET", "/api/images", None)),
+        ("GET /api/images/{image_id}", 5, False, lambda rng: ("GET", f"/api/images/{image(rng)}", None)),
+        ("GET /api/images/{image_id}/file", 15, False, lambda rng: ("GET", f"/api/images/{image(rng)}/file?size=thumb", None)),
+        ("GET /api/services", 10, False, lambda rng: ("GET", "/api/services", None)),
+        ("GET /api/search/albums", 5, False, lambda rng: ("GET", f"/api/search/albums?q={rng.choice(SEARCH_TERMS)}", None)),
+        ("POST /api/contact", 2, False, lambda rng: ("POST", "/api/contact", {
+            "name": "压测", "phone": "0912345678", "email": "bench@example.com", "message": "想了解報價",
+        })),
+        ("GET /api/admin/contacts", 3, True, lambda rng: ("GET", "/api/admin/contacts", None)),
+        ("GET /api/admin/contacts/search", 2, True, lambda rng: ("GET", f"/api/admin/contacts/search?q={rng.choice(SEARCH_TERMS)}", None)),
+        ("GET /api/admin/statistics", 3, True, lambda rng: ("GET", "/api/admin/statistics", None)),
+        ("GET /api/admin/albums", 3, True, lambda rng: ("GET", "/api/admin/albums", None)),
+        ("PUT /api/services/{service_id}", 1, True, lambda rng: ("PUT", f"/api/services/{service(rng)}", {"description": f"测试服务 {rng.random():.6f}"})),
+    ]
+
+def percentile(sorted_values, p: float) -> float:
+    """最近秩百分位"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def summarize(samples, elapsed: float) -> dict:
+    """samples 为 (延迟秒, 状态码, SQL 语句数或 None)"""
+    latencies = sorted(latency for latency, _, _ in samples)
+    queries = [count for _, _, count in samples if count is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, status, _ in samples if status >= 400),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "db_queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+async def login(client: httpx.AsyncClient) -> dict:
+    response = await client.post("/api/auth/token", data={
+        "username": os.getenv("ADMIN_USERNAME", "admin"),
+        "password": os.getenv("ADMIN_PASSWORD", "admin123"),
+    })
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def run_load(base_url: str, scenarios, concurrency: int, duration: float, seed_value: int):
+    """并发客户端在 duration 秒内按权重随机请求，返回 ({接口: 样本}, 实际耗时)"""
+    samples = {name: [] for name, _, _, _ in scenarios}
+    weights = [weight for _, weight, _, _ in scenarios]
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        auth_headers = await login(client)
+        deadline = time.perf_counter() + duration
+
+        async def worker(index: int):
+            rng = random.Random(seed_value + index)
+            while time.perf_counter() < deadline:
+                name, _, needs_auth, make_request = rng.choices(scenarios, weights)[0]
+                method, path, body = make_request(rng)
+                started = time.perf_counter()
+                response = await client.request(method, path, json=body, headers=auth_headers if needs_auth else None)
+                await response.aread()
+                latency = time.perf_counter() - started
+                match = QUERIES_PATTERN.search(response.headers.get("server-timing", ""))
+                samples[name].append((latency, response.status_code, int(match.group(1)) if match else None))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/")
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"服务未在 {timeout} 秒内启动: {base_url}")
+
+def start_server(database_url: str, db_mode: str, port: int, workers: int):
+    env = dict(os.environ, DATABASE_URL=database_url, DB_MODE=db_mode, METRICS_ENABLED="true", LOG_LEVEL="WARNING")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(report: dict, baseline: dict = None):
+    header = f"{'endpoint':<38}{'req':>7}{'err':>5}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'sql':>6}"
+    if baseline:
+        header += f"{'Δp95':>9}{'Δrps':>9}"
+    print(header)
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        queries = stats["db_queries_per_request"]
+        line = (f"{name:<38}{stats['requests']:>7}{stats['errors']:>5}{stats['throughput_rps']:>9.1f}"
+                f"{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}"
+                f"{queries if queries is not None else '-':>6}")
+        if baseline:
+            previous = baseline["total"] if name == "TOTAL" else baseline["endpoints"].get(name)
+            if previous and previous["latency_ms"]["p95"] and previous["throughput_rps"]:
+                line += f"{(latency['p95'] / previous['latency_ms']['p95'] - 1) * 100:>+8.1f}%"
+                line += f"{(stats['throughput_rps'] / previous['throughput_rps'] - 1) * 100:>+8.1f}%"
+        print(line)
+
+async def main():
+    parser = argparse.ArgumentParser(description="主要接口的并发负载基准")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="会被清空重建，请使用单独的数据库")
+    parser.add_argument("--albums", type=int, default=200)
+    parser.add_argument("--images", type=int, default=5000)
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0, help="压测秒数")
+    parser.add_argument("--warmup", type=float, default=3.0, help="预热秒数，不计入结果")
+    parser.add_argument("--seed", type=int, default=42, help="随机请求序列的种子")
+    parser.add_argument("--db-mode", default="async", choices=["async", "sync"])
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker 数")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--base-url", help="压测已运行的服务，不自动启动 uvicorn")
+    parser.add_argument("--output", help=f"结果文件，默认写入 {RESULTS_DIR}/load-<时间>.json")
+    parser.add_argument("--baseline", help="之前的结果文件，输出 p95 和吞吐量的变化")
+    args = parser.parse_args()
+
+    volumes = {"albums": args.albums, "images": args.images, "services": args.services, "contacts": args.contacts}
+    if not args.skip_seed:
+        print("写入测试数据...")
+        seed(args.database_url, **volumes)
+
+    scenarios = build_scenarios(volumes)
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_server(args.database_url, args.db_mode, args.port, args.workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_ready(base_url)
+        if args.warmup > 0:
+            await run_load(base_url, scenarios, args.concurrency, args.warmup, args.seed - 1)
+        samples, elapsed = await run_load(base_url, scenarios, args.concurrency, args.duration, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "base_url": args.base_url,
+            "database": args.database_url.split("://", 1)[0] if args.base_url is None else None,
+            "db_mode": args.db_mode if args.base_url is None else None,
+            "workers": args.workers if args.base_url is None else None,
+            "volumes": volumes,
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 3),
+            "seed": args.seed,
+        },
+        "endpoints": {name: summarize(endpoint_samples, elapsed) for name, endpoint_samples in samples.items() if endpoint_samples},
+        "total": summarize([sample for endpoint_samples in samples.values() for sample in endpoint_samples], elapsed),
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\n结果已写入 {output}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
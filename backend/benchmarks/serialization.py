@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+列表响应序列化微基准：100 和 1000 条相册、图片、客户留言（未入库的 ORM 对象），比较
+    fastapi+json    FastAPI 通用路径（校验、转为 jsonable 结构）+ 标准库 json
+    fastapi+orjson  FastAPI 通用路径 + ORJSONResponse
+    fast path       缓存的 TypeAdapter 直接序列化为 JSON 字节（serialization.json_response）
+每次调用的平均耗时。不访问数据库。
+
+用法：
+    python benchmarks/serialization.py --repeat 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import models, schemas
+from app.serialization import DefaultResponse, json_response
+
+SIZES = (100, 1000)
+
+def make_rows(kind: str, count: int):
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        created_at = start + timedelta(minutes=i)
+        if kind == "albums":
+            rows.append(models.AlbumModel(
+                id=i + 1, album_name=f"相册 {i}", label=models.LabelEnum.HOUSE, description="客厅翻新",
+                cover_image=None, created_at=created_at, updated_at=created_at,
+            ))
+        elif kind == "images":
+            rows.append(models.ImageModel(
+                id=i + 1, image_name=f"image_{i}.jpg", object_name=f"uploads/blobs/ab/{i:064x}.jpg", album_id=1,
+                description=None, derivatives={"thumb": f"uploads/blobs/ab/{i:064x}_thumb.jpg"},
+                width=4000, height=3000, file_size=2400000, mime_type="image/jpeg",
+                placeholder="data:image/webp;base64,UklGRjQAAABXRUJQVlA4ICgAAADQAQCdASoQAAwAAkA4JaQAA3AA/v89WAAAAA==",
+                created_at=created_at, updated_at=created_at,
+            ))
+        else:
+            rows.append(models.ContactModel(
+                id=i + 1, name=f"客户 {i}", phone="0912345678", email=f"customer{i}@example.com",
+                message="想了解室內裝修報價", is_read=1, created_at=created_at,
+            ))
+    return rows
+
+RESPONSE_TYPES = {
+    "albums": List[schemas.Album],
+    "images": List[schemas.Image],
+    "contacts": List[schemas.ContactResponse],
+}
+
+async def generic(field, rows, response_class):
+    content = await serialize_response(field=field, response_content=rows, is_coroutine=True)
+    return response_class(content).body
+
+async def measure(func, repeat: int) -> float:
+    """平均耗时（毫秒）"""
+    await func()  # 预热
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+async def main():
+    parser = argparse.ArgumentParser(description="列表响应序列化微基准")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'case':<16}{'fastapi+json':>14}{'fastapi+orjson':>16}{'fast path':>12}{'speedup':>10}")
+    for kind, response_type in RESPONSE_TYPES.items():
+        field = create_response_field(name=f"Response_{kind}", type_=response_type)
+        for size in SIZES:
+            rows = make_rows(kind, size)
+            # 三种方式的输出应当一致
+            expected = await serialize_response(field=field, response_content=rows)
+            assert json.loads(json_response(response_type, rows).body) == expected
+
+            baseline = await measure(lambda: generic(field, rows, JSONResponse), args.repeat)
+            orjson_ms = await measure(lambda: generic(field, rows, DefaultResponse), args.repeat)
+
+            async def fast():
+                return json_response(response_type, rows).body
+            fast_ms = await measure(fast, args.repeat)
+            print(f"{kind + ' x' + str(size):<16}{baseline:>12.2f}ms{orjson_ms:>14.2f}ms{fast_ms:>10.2f}ms{baseline / fast_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
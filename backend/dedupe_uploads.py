@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+把 uploads/ 中按时间戳命名的旧文件迁移到内容寻址存储（uploads/blobs），
+相同内容只保留一份，并更新 images.object_name。
+
+用法：
+    python dedupe_uploads.py --dry-run   # 只输出将要进行的操作
+    python dedupe_uploads.py
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import hashlib
+from dotenv import load_dotenv
+
+# 加载环境变量
+load_dotenv()
+
+# 设置工作目录，object_name 是相对于 backend 目录的路径
+script_dir = os.path.dirname(os.path.abspath(__file__))
+os.chdir(script_dir)
+sys.path.insert(0, script_dir)
+
+from app import models, storage, image_processing, object_storage
+from app.database import SessionLocal
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(storage.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description="迁移旧上传文件到内容寻址存储")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    created, stale = 0, []
+    try:
+        images = db.query(models.ImageModel).filter(
+            ~models.ImageModel.object_name.startswith(storage.BLOB_DIR)
+        ).all()
+        for image in images:
+            if not os.path.exists(image.object_name):
+                print(f"跳过（文件不存在）: {image.id} {image.object_name}")
+                continue
+            path = storage.blob_path(file_sha256(image.object_name), os.path.splitext(image.object_name)[1])
+            print(f"{image.id}: {image.object_name} -> {path}")
+            if args.dry_run:
+                continue
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                shutil.copy2(image.object_name, path)
+                created += 1
+                object_storage.backend.put(path)
+            # 旧文件和旧衍生图在提交后删除，新衍生图按 blob 路径重新生成
+            stale.append(models.ImageModel(object_name=image.object_name, derivatives=image.derivatives))
+            image.object_name = path
+            image.derivatives = None
+        db.commit()
+        migrated = [(image.id, image.object_name) for image in images if image.object_name.startswith(storage.BLOB_DIR)]
+    finally:
+        db.close()
+
+    for old in stale:
+        image_processing.remove_image_files(old)
+    for image_id, path in migrated:
+        image_processing.process_image(image_id, path)
+
+    print(f"迁移记录 {len(stale)} 条，新建 blob {created} 个")
+
+if __name__ == "__main__":
+    main()
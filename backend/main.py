@@ -1,11 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 import os
+import asyncio
 from app.routes import router as api_router
 from app.auth_routes import router as auth_router
 from app.database import engine, Base
 from app.admin_routes import router as admin_router
+from app import auth, image_processing, metrics, log, compression, resumable
 
 # 创建上传目录
 os.makedirs("uploads", exist_ok=True)
@@ -26,10 +29,48 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor",  # 游标分页
+                    "Location", "Upload-Offset", "Upload-Length", "Upload-Expires"],  # 断点续传
 )
 
-# 挂载静态文件目录
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# 按 Accept-Encoding 压缩 JSON 等动态响应
+if compression.COMPRESSION_ENABLED:
+    app.add_middleware(compression.CompressionMiddleware)
+
+# 请求耗时、数据库语句统计和 /metrics（在压缩之外，记录实际发送的字节数）
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# 挂载静态文件目录，可压缩的文件返回预压缩的 .br/.gz
+app.mount("/uploads", compression.PrecompressedStaticFiles(directory="uploads"), name="uploads")
+
+@app.on_event("startup")
+async def hash_admin_password():
+    # 启动时计算一次管理员密码哈希
+    await run_in_threadpool(auth.get_admin_password_hash)
+
+@app.on_event("startup")
+async def start_upload_cleanup():
+    # 定期删除过期的断点续传会话
+    app.state.upload_cleanup = asyncio.create_task(resumable.run_cleanup())
+
+@app.on_event("shutdown")
+async def stop_upload_cleanup():
+    app.state.upload_cleanup.cancel()
+
+@app.on_event("shutdown")
+async def shutdown_image_workers():
+    # 等待未完成的衍生图任务
+    image_processing.shutdown()
+
+@app.on_event("shutdown")
+async def flush_logs():
+    # 写出队列中剩余的日志
+    log.shutdown()
 
 @app.get("/")
 async def root():
@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# 在导入应用之前指向临时的 SQLite 数据库和上传目录
+_workdir = tempfile.mkdtemp(prefix="kejing-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.chdir(_workdir)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+import main
+from app.cache import catalog_cache
+from app.database import Base, engine
+
+@pytest.fixture(autouse=True)
+def reset_database():
+    # 每个测试使用空表
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    catalog_cache.invalidate_sync("albums", "statistics")
+    yield
+
+@pytest.fixture
+def client():
+    # 不进入 lifespan：关闭事件会停止模块级的线程池和日志队列，之后的测试无法再使用
+    return TestClient(main.app)
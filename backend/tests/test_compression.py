@@ -0,0 +1,77 @@
+import asyncio
+import os
+
+from app.compression import CompressionMiddleware
+from app.file_response import RangeFileResponse, ZEROCOPY_EXTENSION
+from app.metrics import MetricsMiddleware, RESPONSE_SIZE
+
+def run_app(app, path="/file", headers=None):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": headers or [],
+        "extensions": {ZEROCOPY_EXTENSION: {}},
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+def test_zerocopy_response_keeps_start_message_when_compressing(tmp_path):
+    path = tmp_path / "page.svg"
+    path.write_bytes(b"<svg>" + b" " * 4096 + b"</svg>")
+
+    async def app(scope, receive, send):
+        await RangeFileResponse(str(path), media_type="image/svg+xml")(scope, receive, send)
+
+    messages = run_app(CompressionMiddleware(app), headers=[(b"accept-encoding", b"gzip")])
+    assert [message["type"] for message in messages] == ["http.response.start", ZEROCOPY_EXTENSION]
+    headers = dict(messages[0]["headers"])
+    assert b"content-encoding" not in headers
+    assert headers[b"content-length"] == str(path.stat().st_size).encode()
+    assert messages[1]["count"] == path.stat().st_size
+
+def test_metrics_count_zerocopy_bytes(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"\xff" * 5000)
+
+    async def app(scope, receive, send):
+        await RangeFileResponse(str(path), media_type="image/jpeg")(scope, receive, send)
+
+    def recorded_bytes():
+        # 没有匹配路由的请求记在 unmatched 下，序列为 [各区间计数..., 总和, 总数]
+        series = RESPONSE_SIZE._values.get(("GET", "unmatched"))
+        return series[-2] if series else 0
+
+    before = recorded_bytes()
+    messages = run_app(MetricsMiddleware(app))
+    assert messages[-1]["type"] == ZEROCOPY_EXTENSION
+    assert recorded_bytes() - before == 5000
+
+def test_static_identity_response_varies_on_accept_encoding(client):
+    os.makedirs("uploads", exist_ok=True)
+    with open(os.path.join("uploads", "plan.svg"), "wb") as f:
+        f.write(b"<svg>" + b" " * 4096 + b"</svg>")
+    with open(os.path.join("uploads", "tiny.svg"), "wb") as f:
+        f.write(b"<svg></svg>")
+
+    identity = client.get("/uploads/plan.svg", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/uploads/plan.svg", headers={"Accept-Encoding": "gzip"})
+    not_modified = client.get("/uploads/plan.svg", headers={"Accept-Encoding": "identity", "If-None-Match": identity.headers["ETag"]})
+
+    assert "content-encoding" not in identity.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    for response in (identity, compressed, not_modified):
+        assert response.headers["Vary"] == "Accept-Encoding"
+    assert not_modified.status_code == 304
+    # 小于 COMPRESSION_MIN_SIZE 的文件不会有预压缩版本
+    assert "vary" not in client.get("/uploads/tiny.svg").headers
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import event
+
+from app import models
+from app.database import SessionLocal, async_engine, engine
+
+@pytest.fixture
+def count_queries():
+    """统计期间两个引擎执行的 SQL 语句"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    for target in engines:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+def seed_gallery(album_count, images_per_album=6):
+    db = SessionLocal()
+    try:
+        albums = [models.AlbumModel(album_name=f"相册 {i}", label=models.LabelEnum.HOUSE) for i in range(album_count)]
+        db.add_all(albums)
+        db.flush()
+        for album in albums:
+            images = [
+                models.ImageModel(image_name=f"{album.id}-{i}.jpg", object_name=f"uploads/{album.id}-{i}.jpg", album_id=album.id)
+                for i in range(images_per_album)
+            ]
+            db.add_all(images)
+            db.flush()
+            # 封面使用不在前几张中的图片
+            album.cover_image = str(images[-1].id)
+        db.commit()
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("album_count", [1, 10, 50])
+def test_gallery_uses_two_queries(client, count_queries, album_count):
+    seed_gallery(album_count)
+    client.get("/api/gallery", params={"limit": 1})  # 建立连接
+    count_queries.clear()
+
+    response = client.get("/api/gallery", params={"images_per_album": 4})
+
+    assert response.status_code == 200
+    gallery = response.json()
+    assert len(gallery) == album_count
+    assert all(len(album["images"]) == 4 and album["image_count"] == 6 for album in gallery)
+    assert all(album["cover"]["id"] == int(album["cover_image"]) for album in gallery)
+    assert len(count_queries) == 2
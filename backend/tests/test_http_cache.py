@@ -0,0 +1,20 @@
+def test_etag_changes_for_edits_within_the_same_second(client):
+    album_id = client.post("/api/albums", json={"album_name": "客厅", "label": "house"}).json()["id"]
+    first = client.get(f"/api/albums/{album_id}")
+    etag = first.headers["ETag"]
+    assert client.get(f"/api/albums/{album_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    # SQLite 的 updated_at 只精确到秒，两次请求通常落在同一秒内
+    client.put(f"/api/albums/{album_id}", json={"album_name": "厨房"})
+    response = client.get(f"/api/albums/{album_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["album_name"] == "厨房"
+    assert response.headers["ETag"] != etag
+
+def test_service_list_etag_changes_after_reorder(client):
+    ids = [client.post("/api/services", json={"name": f"服务 {i}", "description": "说明"}).json()["id"] for i in range(2)]
+    etag = client.get("/api/services").headers["ETag"]
+    client.put("/api/services/order", json={"ids": ids[::-1]})
+    response = client.get("/api/services", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [service["id"] for service in response.json()] == ids[::-1]
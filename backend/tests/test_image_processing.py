@@ -0,0 +1,19 @@
+import os
+
+from app import models
+from app.image_processing import remove_image_files, transcoded_path
+
+def test_transcode_cache_does_not_collide_with_blob_of_same_hash(tmp_path):
+    # 相同内容以不同扩展名上传时是两个 blob：<哈希>.jpg 和 <哈希>.webp
+    jpeg_blob = str(tmp_path / "3f2a.jpg")
+    webp_blob = str(tmp_path / "3f2a.webp")
+    for path in (jpeg_blob, webp_blob, transcoded_path(jpeg_blob, "webp")):
+        with open(path, "wb") as f:
+            f.write(b"data")
+    assert transcoded_path(jpeg_blob, "webp") != webp_blob
+
+    remove_image_files(models.ImageModel(object_name=jpeg_blob, derivatives=None))
+
+    assert os.path.exists(webp_blob)
+    assert not os.path.exists(jpeg_blob)
+    assert not os.path.exists(transcoded_path(jpeg_blob, "webp"))
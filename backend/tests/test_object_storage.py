@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from app.object_storage import S3Storage
+
+BUCKET = "kejing-test"
+
+@pytest.fixture
+def s3(monkeypatch, tmp_path):
+    # moto 在进程内模拟 S3，代替 MinIO 等本地服务
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.chdir(tmp_path)
+    with moto.mock_aws():
+        boto3.client("s3").create_bucket(Bucket=BUCKET)
+        yield S3Storage(bucket=BUCKET, endpoint_url=None)
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+def test_put_fetch_exists_delete(s3):
+    path = os.path.join("uploads", "blobs", "3f", "3f2a.jpg")
+    write(path, b"jpeg")
+    s3.put(path)
+
+    head = s3._client.head_object(Bucket=BUCKET, Key="uploads/blobs/3f/3f2a.jpg")
+    assert head["ContentType"] == "image/jpeg"
+    assert "immutable" in head["CacheControl"]
+
+    # 删除本地缓存后按需下载
+    os.remove(path)
+    assert s3.exists(path)
+    assert s3.fetch(path) == path
+    with open(path, "rb") as f:
+        assert f.read() == b"jpeg"
+
+    s3.delete([path])
+    assert not os.path.exists(path)
+    assert not s3.exists(path)
+
+def test_fetch_missing_object_raises_file_not_found(s3):
+    path = os.path.join("uploads", "blobs", "00", "missing.jpg")
+    with pytest.raises(FileNotFoundError):
+        s3.fetch(path)
+    assert not os.listdir(os.path.dirname(path))
+
+def test_presigned_url_points_to_object(s3):
+    url = s3.presigned_url(os.path.join("uploads", "blobs", "3f", "3f2a.jpg"))
+    assert f"{BUCKET}" in url and "uploads/blobs/3f/3f2a.jpg" in url
+    assert "X-Amz-Expires=" in url or "Expires=" in url
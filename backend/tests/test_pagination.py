@@ -0,0 +1,53 @@
+def create_albums(client, count):
+    return [client.post("/api/albums", json={"album_name": f"相册 {i}", "label": "house"}).json()["id"] for i in range(count)]
+
+def walk(client, path, limit):
+    """沿 X-Next-Cursor 翻到最后一页，返回全部 id"""
+    response = client.get(path, params={"limit": limit})
+    ids = [row["id"] for row in response.json()]
+    for _ in range(100):
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get(path, params={"limit": limit, "cursor": cursor})
+        ids.extend(row["id"] for row in response.json())
+    return ids
+
+def test_cursor_walks_every_album_once(client):
+    # 同一秒内创建，created_at 相同，只能靠 id 区分
+    album_ids = create_albums(client, 5)
+    ids = walk(client, "/api/albums", limit=2)
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(album_ids)
+    assert ids == sorted(ids, reverse=True)
+
+def test_prev_cursor_returns_previous_page(client):
+    create_albums(client, 5)
+    first = client.get("/api/albums", params={"limit": 2})
+    second = client.get("/api/albums", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    back = client.get("/api/albums", params={"limit": 2, "cursor": second.headers["X-Prev-Cursor"]})
+    assert [row["id"] for row in back.json()] == [row["id"] for row in first.json()]
+
+def test_cursor_walks_every_image_once(client):
+    album_id = create_albums(client, 1)[0]
+    image_ids = [
+        client.post("/api/images", json={"image_name": f"{i}.jpg", "object_name": f"uploads/{i}.jpg", "album_id": album_id}).json()["id"]
+        for i in range(7)
+    ]
+    ids = walk(client, f"/api/albums/{album_id}/images", limit=3)
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(image_ids)
+
+def test_not_modified_page_keeps_cursor_headers(client):
+    create_albums(client, 5)
+    first = client.get("/api/albums", params={"limit": 2})
+    second = client.get("/api/albums", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+
+    revalidated = client.get(
+        "/api/albums",
+        params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+        headers={"If-None-Match": second.headers["ETag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["X-Next-Cursor"] == second.headers["X-Next-Cursor"]
+    assert revalidated.headers["X-Prev-Cursor"] == second.headers["X-Prev-Cursor"]
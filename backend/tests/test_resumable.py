@@ -0,0 +1,70 @@
+import io
+import os
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app import crud, resumable
+
+def jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (120, 80), "red").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+def create_session(client, length):
+    album_id = client.post("/api/albums", json={"album_name": "相册", "label": "house"}).json()["id"]
+    response = client.post("/api/upload/sessions", json={"album_id": album_id, "filename": "photo.jpg", "length": length})
+    assert response.status_code == 201
+    return response.headers["Location"], response.json()["id"]
+
+def test_chunks_resume_and_finish(client):
+    data = jpeg_bytes()
+    url, _ = create_session(client, len(data))
+
+    assert client.patch(url, content=data[:500], headers={"Upload-Offset": "0"}).json()["offset"] == 500
+    conflict = client.patch(url, content=data[:500], headers={"Upload-Offset": "0"})
+    assert conflict.status_code == 409 and conflict.headers["Upload-Offset"] == "500"
+    assert client.head(url).headers["Upload-Offset"] == "500"
+
+    response = client.patch(url, content=data[500:], headers={"Upload-Offset": "500"})
+    assert response.status_code == 200
+    assert response.json()["image"]["width"] == 120
+    assert client.get(url).status_code == 404
+
+def test_locked_session_rejects_concurrent_chunk(client):
+    data = jpeg_bytes()
+    url, upload_id = create_session(client, len(data))
+    # 模拟另一个 worker 正在写入同一会话
+    fd = resumable._acquire(upload_id)
+    try:
+        assert client.patch(url, content=data[:100], headers={"Upload-Offset": "0"}).status_code == 423
+    finally:
+        os.close(fd)
+    assert client.patch(url, content=data[:100], headers={"Upload-Offset": "0"}).json()["offset"] == 100
+
+def test_expired_sessions_are_removed(client, monkeypatch):
+    url, upload_id = create_session(client, 10)
+    monkeypatch.setattr(resumable, "RESUMABLE_UPLOAD_EXPIRES", -1)
+    client.patch(url, content=b"12345", headers={"Upload-Offset": "0"})
+    assert resumable.remove_expired_sessions() == 1
+    assert not os.path.exists(resumable._session_path(upload_id))
+
+def test_failed_finish_keeps_session_for_retry(client, monkeypatch):
+    data = jpeg_bytes()
+    url, upload_id = create_session(client, len(data))
+    assert client.patch(url, content=data[:500], headers={"Upload-Offset": "0"}).status_code == 200
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("数据库不可用")
+    monkeypatch.setattr(crud, "create_image", fail)
+    failing = TestClient(main.app, raise_server_exceptions=False)
+    assert failing.patch(url, content=data[500:], headers={"Upload-Offset": "500"}).status_code == 500
+    monkeypatch.undo()
+
+    # 会话和全部字节都保留，重新发送空的最后一块即可完成
+    assert client.head(url).headers["Upload-Offset"] == str(len(data))
+    response = client.patch(url, content=b"", headers={"Upload-Offset": str(len(data))})
+    assert response.status_code == 200
+    assert response.json()["image"]["file_size"] == len(data)
+    assert not os.path.exists(resumable._session_path(upload_id))
@@ -0,0 +1,21 @@
+def create_services(client, count):
+    return [client.post("/api/services", json={"name": f"服务 {i}", "description": "说明"}).json()["id"] for i in range(count)]
+
+def test_reorder_sets_order_of_every_service(client):
+    ids = create_services(client, 3)
+    response = client.put("/api/services/order", json={"ids": ids[::-1]})
+    assert response.status_code == 200
+    assert [service["id"] for service in response.json()] == ids[::-1]
+    assert [service["order"] for service in response.json()] == [0, 1, 2]
+
+def test_reorder_rejects_empty_and_duplicate_ids(client):
+    ids = create_services(client, 2)
+    assert client.put("/api/services/order", json={"ids": []}).status_code == 422
+    assert client.put("/api/services/order", json={"ids": [ids[0], ids[0], ids[1]]}).status_code == 422
+
+def test_reorder_requires_all_services(client):
+    ids = create_services(client, 3)
+    assert client.put("/api/services/order", json={"ids": ids[:2]}).status_code == 400
+    assert client.put("/api/services/order", json={"ids": ids + [999]}).status_code == 400
+    orders = {service["id"]: service["order"] for service in client.get("/api/services").json()}
+    assert orders == {service_id: 0 for service_id in ids}
@@ -0,0 +1,45 @@
+import asyncio
+import os
+
+from app import crud, schemas, storage
+from app.database import AsyncSessionLocal
+
+def test_release_waits_for_concurrent_upload_of_same_blob(client):
+    album_id = client.post("/api/albums", json={"album_name": "相册", "label": "house"}).json()["id"]
+    path = storage.blob_path("ab" * 32, ".jpg")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"jpeg")
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            old = await crud.create_image(db, schemas.ImageCreate(image_name="old.jpg", object_name=path, album_id=album_id))
+            await crud.delete_image(db, old.id)
+
+            # 上传方持有锁：删除方必须等它写入新记录后再统计引用
+            async with storage.blob_lock(path):
+                release = asyncio.create_task(storage.release_image_files(db, old))
+                await asyncio.sleep(0.05)
+                assert not release.done()
+                async with AsyncSessionLocal() as upload_db:
+                    await crud.create_image(upload_db, schemas.ImageCreate(image_name="new.jpg", object_name=path, album_id=album_id))
+            await release
+
+    asyncio.run(scenario())
+    assert os.path.exists(path)
+
+def test_release_removes_blob_without_references(client):
+    album_id = client.post("/api/albums", json={"album_name": "相册", "label": "house"}).json()["id"]
+    path = storage.blob_path("cd" * 32, ".jpg")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"jpeg")
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            image = await crud.create_image(db, schemas.ImageCreate(image_name="a.jpg", object_name=path, album_id=album_id))
+            await crud.delete_image(db, image.id)
+            await storage.release_image_files(db, image)
+
+    asyncio.run(scenario())
+    assert not os.path.exists(path)
@@ -38,6 +38,9 @@ interface AlbumImage {
   updated_at: string;
 }
 
+// 每个批量上传请求包含的文件数
+const UPLOAD_BATCH_SIZE = 20;
+
 export default function AlbumDetailPage() {
   const [album, setAlbum] = useState<Album | null>(null);
   const [images, setImages] = useState<AlbumImage[]>([]);
@@ -146,15 +149,16 @@ export default function AlbumDetailPage() {
       
       const token = localStorage.getItem('admin_token');
       
-      // 上传多个文件
-      for (let i = 0; i < files.length; i++) {
-        const file = files[i];
+      // 批量上传，每批一个请求
+      const selected = Array.from(files);
+      let failedCount = 0;
+      for (let i = 0; i < selected.length; i += UPLOAD_BATCH_SIZE) {
         const formData = new FormData();
-        formData.append('file', file);
+        selected.slice(i, i + UPLOAD_BATCH_SIZE).forEach(file => formData.append('files', file));
         formData.append('album_id', albumId);
         formData.append('description', '');
         
-        const response = await fetch(`${API_URL}/api/upload`, {
+        const response = await fetch(`${API_URL}/api/upload/batch`, {
           method: 'POST',
           headers: {
             'Authorization': `Bearer ${token}`
@@ -162,16 +166,23 @@ export default function AlbumDetailPage() {
           body: formData
         });
         
-        if (response.ok) {
-          const newImage = await response.json();
-          setImages(prev => [...prev, newImage]);
-          setUploadStatus('success');
-          setUploadMessage(`成功上傳 ${files.length} 張圖片`);
-        } else {
+        if (!response.ok) {
           setUploadStatus('error');
           setUploadMessage('上傳圖片錯誤，請重試');
-          break;
+          return;
         }
+        const results: { filename: string; image: AlbumImage | null; error: string | null }[] = await response.json();
+        const uploaded = results.filter(result => result.image).map(result => result.image as AlbumImage);
+        failedCount += results.length - uploaded.length;
+        setImages(prev => [...prev, ...uploaded]);
+      }
+      
+      if (failedCount > 0) {
+        setUploadStatus('error');
+        setUploadMessage(`${failedCount} 張圖片上傳失敗，請重試`);
+      } else {
+        setUploadStatus('success');
+        setUploadMessage(`成功上傳 ${files.length} 張圖片`);
       }
     } catch (error) {
       console.error('上傳圖片出錯', error);
@@ -401,7 +412,7 @@ export default function AlbumDetailPage() {
                 >
                   <div className="h-56 bg-gray-200 relative overflow-hidden">
                     <img 
-                      src={`${API_URL}/api/images/${image.id}/file`}
+                      src={`${API_URL}/api/images/${image.id}/file?size=thumb`}
                       alt={image.image_name}
                       className="w-full h-full object-cover cursor-pointer transform group-hover:scale-105 transition-transform duration-300"
                       onClick={() => openLightbox(index)}
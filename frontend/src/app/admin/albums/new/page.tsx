@@ -6,6 +6,9 @@ import AdminNav from '@/components/adminNav';
 import Link from 'next/link';
 import { ArrowLeft, Save, Upload, Image as ImageIcon, Check, X, Loader2 } from 'lucide-react';
 
+// 每个批量上传请求包含的文件数
+const UPLOAD_BATCH_SIZE = 20;
+
 export default function NewAlbumWithUploadPage() {
   const [formData, setFormData] = useState({
     album_name: '',
@@ -124,17 +127,17 @@ export default function NewAlbumWithUploadPage() {
       setUploadSuccess(false);
       const token = localStorage.getItem('admin_token');
       
-      // 上传多个文件
+      // 批量上传，每批一个请求
       let uploadedCount = 0;
       
-      for (let i = 0; i < selectedFiles.length; i++) {
-        const file = selectedFiles[i];
+      for (let i = 0; i < selectedFiles.length; i += UPLOAD_BATCH_SIZE) {
+        const batch = selectedFiles.slice(i, i + UPLOAD_BATCH_SIZE);
         const formData = new FormData();
-        formData.append('file', file);
+        batch.forEach(file => formData.append('files', file));
         formData.append('album_id', String(newAlbumId));
         formData.append('description', '');
         
-        const response = await fetch(`${API_URL}/api/upload`, {
+        const response = await fetch(`${API_URL}/api/upload/batch`, {
           method: 'POST',
           headers: {
             'Authorization': `Bearer ${token}`
@@ -143,8 +146,12 @@ export default function NewAlbumWithUploadPage() {
         });
         
         if (response.ok) {
-          uploadedCount++;
-          setUploadProgress(Math.round((uploadedCount / selectedFiles.length) * 100));
+          const results: { filename: string; error: string | null }[] = await response.json();
+          results.filter(result => result.error).forEach(result => {
+            console.error('上传图片失败:', result.filename, result.error);
+          });
+          uploadedCount += results.filter(result => !result.error).length;
+          setUploadProgress(Math.round(((i + batch.length) / selectedFiles.length) * 100));
         } else {
           console.error('上传图片失败:', await response.text());
         }
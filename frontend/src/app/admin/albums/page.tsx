@@ -207,7 +207,7 @@ export default function AlbumsPage() {
                   <div className="h-40 bg-gray-200 relative overflow-hidden group-hover:brightness-105 transition-all duration-300">
                     {album.cover_image ? (
                       <img 
-                        src={`${API_URL}/api/images/${album.cover_image}/file`} 
+                        src={`${API_URL}/api/images/${album.cover_image}/file?size=thumb`} 
                         alt={album.album_name} 
                         className="w-full h-full object-cover transform group-hover:scale-105 transition-transform duration-500"
                       />
@@ -4,7 +4,7 @@ import React, { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import AdminNav from '@/components/adminNav';
 import { Eye, Trash2, Mail, CheckCircle, PhoneCall, Clock } from 'lucide-react';
-import { fetchAllContacts, updateContactStatus, deleteContact, ContactResponse, ContactUpdateRequest } from '@/app/api/contactApi';
+import { fetchAllContacts, searchContacts, updateContactStatus, deleteContact, ContactResponse, ContactUpdateRequest } from '@/app/api/contactApi';
 
 // 扩展ContactResponse接口，使其与后端数据匹配
 interface Contact extends Omit<ContactResponse, 'is_read'> {
@@ -19,6 +19,7 @@ export default function MessagesPage() {
   const [selectedContact, setSelectedContact] = useState<Contact | null>(null);
   const [contactToDelete, setContactToDelete] = useState<Contact | null>(null);
   const [filter, setFilter] = useState<'all' | 'unread' | 'read'>('all');
+  const [searchQuery, setSearchQuery] = useState('');
   const router = useRouter();
   const API_URL = process.env.NEXT_PUBLIC_API_URL;
 
@@ -37,7 +38,9 @@ export default function MessagesPage() {
     try {
       setIsLoading(true);
       const token = localStorage.getItem('admin_token') || '';
-      const data = await fetchAllContacts(token);
+      // 有关键词时使用服务端全文搜索
+      const query = searchQuery.trim();
+      const data = query ? await searchContacts(token, query) : await fetchAllContacts(token);
       
       // 转换数据类型以匹配界面需要
       const contactsData = data.map(contact => ({
@@ -156,6 +159,20 @@ export default function MessagesPage() {
               <p className="mt-2 text-gray-600">查看並管理用戶通過聯繫表單提交的消息。</p>
             </div>
             <div className="flex flex-col sm:flex-row space-y-3 sm:space-y-0 sm:space-x-3">
+              <form
+                onSubmit={(e) => {
+                  e.preventDefault();
+                  fetchContactsList();
+                }}
+              >
+                <input
+                  type="search"
+                  value={searchQuery}
+                  onChange={(e) => setSearchQuery(e.target.value)}
+                  placeholder="搜索姓名、電話、郵箱或留言"
+                  className="w-full sm:w-64 px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"
+                />
+              </form>
               <div className="flex space-x-1 bg-white border border-gray-300 rounded-md p-1">
                 <button
                   onClick={() => setFilter('all')}
@@ -48,9 +48,9 @@ export default function ServicesPage() {
     try {
       setIsLoading(true);
       const token = localStorage.getItem('admin_token');
-      // 添加時間戳參數避免緩存問題
-      const timestamp = new Date().getTime();
-      const response = await fetch(`${API_URL}/api/services?t=${timestamp}`, {
+      // 使用 ETag 重新驗證緩存，數據未變化時服務端返回 304
+      const response = await fetch(`${API_URL}/api/services`, {
+        cache: 'no-cache',
         headers: {
           'Authorization': `Bearer ${token}`
         }
@@ -190,6 +190,23 @@ export default function ServicesPage() {
     setIsReordering(!isReordering);
   };
 
+  // 一个请求提交完整顺序
+  const saveOrder = async (orderedServices: Service[]) => {
+    try {
+      const token = localStorage.getItem('admin_token');
+      await fetch(`${API_URL}/api/services/order`, {
+        method: 'PUT',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${token}`
+        },
+        body: JSON.stringify({ ids: orderedServices.map(service => service.id) })
+      });
+    } catch (error) {
+      console.error('更新服務順序出錯', error);
+    }
+  };
+
   const handleMoveUp = async (index: number) => {
     if (index === 0) return;
     
@@ -203,31 +220,7 @@ export default function ServicesPage() {
     newServices[index - 1].order = index - 1;
     
     setServices(newServices);
-    
-    // 保存到服务器
-    try {
-      const token = localStorage.getItem('admin_token');
-      await Promise.all([
-        fetch(`${API_URL}/api/services/${newServices[index].id}`, {
-          method: 'PUT',
-          headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${token}`
-          },
-          body: JSON.stringify({ order: newServices[index].order })
-        }),
-        fetch(`${API_URL}/api/services/${newServices[index - 1].id}`, {
-          method: 'PUT',
-          headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${token}`
-          },
-          body: JSON.stringify({ order: newServices[index - 1].order })
-        })
-      ]);
-    } catch (error) {
-      console.error('更新服務順序出錯', error);
-    }
+    await saveOrder(newServices);
   };
 
   const handleMoveDown = async (index: number) => {
@@ -243,31 +236,7 @@ export default function ServicesPage() {
     newServices[index + 1].order = index + 1;
     
     setServices(newServices);
-    
-    // 保存到服务器
-    try {
-      const token = localStorage.getItem('admin_token');
-      await Promise.all([
-        fetch(`${API_URL}/api/services/${newServices[index].id}`, {
-          method: 'PUT',
-          headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${token}`
-          },
-          body: JSON.stringify({ order: newServices[index].order })
-        }),
-        fetch(`${API_URL}/api/services/${newServices[index + 1].id}`, {
-          method: 'PUT',
-          headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${token}`
-          },
-          body: JSON.stringify({ order: newServices[index + 1].order })
-        })
-      ]);
-    } catch (error) {
-      console.error('更新服務順序出錯', error);
-    }
+    await saveOrder(newServices);
   };
 
   // 模拟图标选项
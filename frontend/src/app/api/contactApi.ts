@@ -75,6 +75,32 @@ export const fetchAllContacts = async (token: string): Promise<ContactResponse[]
   }
 };
 
+/**
+ * 搜索联系表单（仅管理员），结果按相关度排序
+ * @param token 管理员登录token
+ * @param query 关键词，匹配姓名、电话、邮箱和留言
+ * @returns 联系表单列表
+ */
+export const searchContacts = async (token: string, query: string): Promise<ContactResponse[]> => {
+  try {
+    const params = new URLSearchParams({ q: query, limit: '100' });
+    const response = await fetch(`${API_URL}/api/admin/contacts/search?${params}`, {
+      headers: {
+        'Authorization': `Bearer ${token}`,
+      },
+    });
+
+    if (!response.ok) {
+      throw new Error('搜索联系表单失败');
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('搜索联系表单出错:', error);
+    return [];
+  }
+};
+
 /**
  * 获取单个联系表单详情（仅管理员）
  * @param token 管理员登录token
@@ -10,6 +10,8 @@ export interface Album {
   created_at: string;
   updated_at: string;
   images?: Image[];
+  cover?: Image | null;
+  image_count?: number;
 }
 
 export interface Image {
@@ -17,6 +19,12 @@ export interface Image {
   image_name: string;
   object_name: string;
   album_id: number;
+  // 图片尺寸和低质量占位图（data URI），原图加载前用于占位
+  width?: number | null;
+  height?: number | null;
+  file_size?: number | null;
+  mime_type?: string | null;
+  placeholder?: string | null;
   created_at: string;
   updated_at: string;
 }
@@ -72,32 +80,24 @@ export const fetchAlbumWithImages = async (albumId: number): Promise<Album | nul
   }
 };
 
-// 获取所有相册并包含图片
+// 获取所有相册并包含图片（画廊聚合接口，一次请求返回封面和前几张图片）
 export const fetchAllAlbumsWithImages = async (label?: string): Promise<Album[]> => {
   try {
     const url = label 
-      ? `${API_URL}/api/albums?label=${label}` 
-      : `${API_URL}/api/albums`;
-    
-    // 先打印一下API URL和完整请求URL，方便调试
-    console.log('API_URL:', API_URL);
-    console.log('请求URL:', url);
+      ? `${API_URL}/api/gallery?label=${label}` 
+      : `${API_URL}/api/gallery`;
     
     const response = await fetch(url);
     if (!response.ok) {
       throw new Error(`获取相册失败: ${response.status} ${response.statusText}`);
     }
     
-    const albums = await response.json();
-    console.log('获取到的相册数据:', albums);
-    
-    // 为每个相册获取图片
-    const albumsWithImages = await Promise.all(
-      albums.map(async (album: Album) => {
-        const imageResponse = await fetch(`${API_URL}/api/albums/${album.id}/images`);
-        if (imageResponse.ok) {
-          const images = await imageResponse.json();
-          return { ...album, images };
+    return await response.json();
+  } catch (error) {
+    console.error('获取相册和图片出错:', error);
+    return [];
+  }
+};
         }
         return { ...album, images: [] };
       })
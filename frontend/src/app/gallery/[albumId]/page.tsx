@@ -151,9 +151,14 @@ export default function AlbumDetailPage() {
                   >
                     <div className="relative h-full w-full overflow-hidden">
                       <img
-                        src={`${process.env.NEXT_PUBLIC_API_URL}/api/images/${image.id}/file`}
+                        src={`${process.env.NEXT_PUBLIC_API_URL}/api/images/${image.id}/file?size=medium`}
                         alt={image.image_name}
-                        className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-110"
+                        width={image.width ?? undefined}
+                        height={image.height ?? undefined}
+                        loading="lazy"
+                        decoding="async"
+                        style={image.placeholder ? { backgroundImage: `url(${image.placeholder})` } : undefined}
+                        className="w-full h-full object-cover bg-cover bg-center transition-transform duration-500 group-hover:scale-110"
                       />
                       <div className="absolute inset-0 bg-gradient-to-t from-black/30 to-transparent opacity-0 group-hover:opacity-100 transition-opacity duration-300 flex items-end">
                         <div className="p-4 w-full">
@@ -78,12 +78,18 @@ export default function GalleryPage() {
               <Link href={`/gallery/${album.id}`} key={album.id}>
                 <Card className="overflow-hidden cursor-pointer hover:shadow-lg transition-shadow">
                   <div className="h-48 relative overflow-hidden">
-                    {album.images && album.images.length > 0 ? (
+                    {/* 封面由 /api/gallery 按 cover_image 计算，未设置时为最新的图片 */}
+                    {album.cover ? (
                       <div className="h-full w-full relative">
                         <img
-                          src={`${process.env.NEXT_PUBLIC_API_URL}/${album.images[0].object_name}`}
+                          src={`${process.env.NEXT_PUBLIC_API_URL}/api/images/${album.cover.id}/file?size=medium`}
                           alt={album.album_name}
-                          className="w-full h-full object-cover"
+                          width={album.cover.width ?? undefined}
+                          height={album.cover.height ?? undefined}
+                          loading="lazy"
+                          decoding="async"
+                          style={album.cover.placeholder ? { backgroundImage: `url(${album.cover.placeholder})` } : undefined}
+                          className="w-full h-full object-cover bg-cover bg-center"
                         />
                       </div>
                     ) : (
@@ -94,7 +100,7 @@ export default function GalleryPage() {
                   </div>
                   <CardContent className="p-4">
                     <h3 className="font-medium text-lg">{album.album_name}</h3>
-                    <p className="text-sm text-gray-500">{album.images?.length || 0} 張圖片</p>
+                    <p className="text-sm text-gray-500">{album.image_count ?? 0} 張圖片</p>
                   </CardContent>
                 </Card>
               </Link>